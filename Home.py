@@ -201,7 +201,7 @@ def render_home():
     
     if not df.empty:
         # Calculate market stats for key metrics
-        market_stats = processor.calculate_market_stats(df)
+        market_stats = processor.get_market_stats(api.get_universe_snapshot())
         
         # Display key metrics in a nice row of stats
         col1, col2, col3, col4 = st.columns(4)
@@ -259,8 +259,8 @@ def render_home():
         # Add a performant market chart
         st.markdown('<h2 class="gold-header">Top Performers</h2>', unsafe_allow_html=True)
         
-        # Get top performers (gainers and losers)
-        gainers, losers = processor.get_top_gainers_losers(df, n=5)
+        # Get top performers (gainers and losers), kept current from each refresh's changes
+        gainers, losers = processor.get_top_movers(api.get_universe_snapshot(), "price_change_24h", n=5)
         
         # Create a combined dataframe of just top and bottom 5
         top_performers = pd.concat([gainers, losers])
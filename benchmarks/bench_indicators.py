@@ -0,0 +1,83 @@
+"""
+Benchmark: RSI and Bollinger bands for a whole token universe.
+
+Compares the previous per-Series pandas implementation (one rolling pass per
+token and indicator, simple-mean RSI) with the batched kernels in
+utils.indicators, which handle every token in one call.
+
+    python -m benchmarks.bench_indicators [n_tokens ...]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import indicators
+
+N_STEPS = 30 * 24  # 30 days of hourly prices
+
+
+def make_prices(n_tokens, n_steps=N_STEPS, seed=0):
+    """Random-walk (time x tokens) price panel"""
+    rng = np.random.default_rng(seed)
+    return 10 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_steps, n_tokens)), axis=0))
+
+
+def per_series_rsi(prices, window=14):
+    """The previous utils.dummy_data.calculate_rsi, kept here as the baseline"""
+    delta = prices.diff()
+    gain = delta.mask(delta < 0, 0)
+    loss = -delta.mask(delta > 0, 0)
+
+    avg_gain = gain.rolling(window=window).mean()
+    avg_loss = loss.rolling(window=window).mean()
+
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def per_series_bollinger(prices, window=20, num_std=2):
+    """The previous utils.dummy_data.calculate_bollinger_bands"""
+    sma = prices.rolling(window=window).mean()
+    std = prices.rolling(window=window).std()
+    return sma + (std * num_std), sma - (std * num_std)
+
+
+def per_series(prices):
+    results = []
+    for column in prices.T:
+        series = pd.Series(column)
+        results.append((per_series_rsi(series), *per_series_bollinger(series)))
+    return results
+
+
+def batched(prices):
+    return indicators.rsi(prices), indicators.bollinger_bands(prices)
+
+
+def best_ms(fn, prices, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(prices)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def main(sizes):
+    print(f"{'tokens':>8} {'per-series ms':>14} {'batched ms':>11} {'speedup':>8} {'band max diff':>14}")
+    for n in sizes:
+        prices = make_prices(n)
+        series_ms, series_result = best_ms(per_series, prices)
+        batch_ms, (_, (_, upper, _)) = best_ms(batched, prices)
+
+        # Bollinger bands must agree with pandas (RSI differs on purpose: Wilder smoothing)
+        reference = np.column_stack([bands[1].values for bands in series_result])
+        diff = np.nanmax(np.abs(upper - reference))
+
+        print(f"{n:>8} {series_ms:>14.1f} {batch_ms:>11.1f} {series_ms / batch_ms:>7.1f}x {diff:>14.2e}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 1_000])
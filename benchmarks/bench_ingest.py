@@ -0,0 +1,109 @@
+"""
+Benchmark: building the token universe frame from /coins/markets payloads.
+
+Compares the previous row-by-row path (a dict per token, if/elif category
+ladder, then pd.DataFrame) with the columnar markets_to_frame.
+
+    python -m benchmarks.bench_ingest [n_tokens ...]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import markets_to_frame
+
+
+def make_payload(n, seed=0):
+    """Synthetic /coins/markets payload with n tokens"""
+    rng = np.random.default_rng(seed)
+    market_caps = rng.lognormal(mean=17, sigma=2.5, size=n)
+    return [
+        {
+            "id": f"token-{i}",
+            "name": f"Token {i}",
+            "symbol": f"tk{i % 5000}",
+            "market_cap": None if i % 97 == 0 else float(market_caps[i]),
+            "current_price": float(rng.lognormal(0, 2)),
+            "total_volume": float(market_caps[i] * rng.uniform(0.01, 0.2)),
+            "price_change_percentage_24h": float(rng.normal(0, 5)),
+            "price_change_percentage_7d_in_currency": float(rng.normal(0, 10)),
+            "image": f"https://example.com/{i}.png",
+            "last_updated": "2025-01-01T00:00:00.000Z",
+        }
+        for i in range(n)
+    ]
+
+
+def row_wise_frame(tokens):
+    """The previous CoinGeckoAPI._get_token_details path, kept here as the baseline"""
+    detailed_tokens = []
+
+    for token in tokens:
+        market_cap = token.get("market_cap", 0)
+        if market_cap is None:
+            market_cap = 0
+
+        if market_cap >= 1_000_000_000:
+            market_cap_category = "Large Cap (>$1B)"
+        elif market_cap >= 100_000_000:
+            market_cap_category = "Mid Cap ($100M-$1B)"
+        elif market_cap >= 10_000_000:
+            market_cap_category = "Small Cap ($10M-$100M)"
+        elif market_cap >= 1_000_000:
+            market_cap_category = "Micro Cap ($1M-$10M)"
+        elif market_cap >= 500_000:
+            market_cap_category = "Nano Cap ($500K-$1M)"
+        else:
+            market_cap_category = "Ultra Nano Cap (<$500K)"
+
+        detailed_tokens.append({
+            "id": token["id"],
+            "name": token.get("name", "Unknown"),
+            "symbol": token.get("symbol", "").upper(),
+            "market_cap": market_cap,
+            "market_cap_category": market_cap_category,
+            "price": token.get("current_price", 0),
+            "volume_24h": token.get("total_volume", 0),
+            "price_change_24h": token.get("price_change_percentage_24h", 0),
+            "price_change_7d": token.get("price_change_percentage_7d_in_currency", 0),
+            "image": token.get("image", ""),
+            "last_updated": token.get("last_updated", ""),
+        })
+
+    return pd.DataFrame(detailed_tokens)
+
+
+def measure(fn, payload, repeat=5):
+    """Best wall time in ms and peak traced memory in MB"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    frame = fn(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(times) * 1000, peak / 1e6, frame
+
+
+def main(sizes):
+    print(f"{'tokens':>8} {'row-wise ms':>12} {'columnar ms':>12} {'speedup':>8} {'row-wise MB':>12} {'columnar MB':>12}")
+    for n in sizes:
+        payload = make_payload(n)
+        row_ms, row_mb, row_df = measure(row_wise_frame, payload)
+        col_ms, col_mb, col_df = measure(markets_to_frame, payload)
+
+        # Both paths must agree on the categories
+        assert (row_df["market_cap_category"].values == col_df["market_cap_category"].astype(str).values).all()
+
+        print(f"{n:>8} {row_ms:>12.1f} {col_ms:>12.1f} {row_ms / col_ms:>7.1f}x {row_mb:>12.1f} {col_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
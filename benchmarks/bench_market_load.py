@@ -0,0 +1,52 @@
+"""
+Load test: analytics over a simulated universe of hourly history.
+
+Generates n_tokens x n_days of hourly paths with simulate_market into
+memory-mapped files, then runs the risk engine, RSI and Bollinger kernels
+over the mapped panel in token blocks, and a correlation matrix for the
+largest block.
+
+    python -m benchmarks.bench_market_load [n_tokens] [n_days] [block]
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from utils import indicators
+from utils.analytics import correlation_matrix, log_returns
+from utils.market_simulator import load_market, simulate_market
+from utils.risk import risk_metrics
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    print(f"{label:<34} {time.perf_counter() - start:>8.2f} s")
+    return result
+
+
+def main(n_tokens=10_000, n_days=365, block=1_000):
+    n_steps = n_days * 24
+    out_dir = tempfile.mkdtemp(prefix="market_load_")
+    try:
+        timed(f"simulate {n_tokens} x {n_steps}", lambda: simulate_market(n_tokens, n_steps, seed=1, out_dir=out_dir))
+        panel = load_market(out_dir)
+        print(f"{'on disk':<34} {3 * panel.price.nbytes / 1e9:>8.2f} GB")
+
+        def by_block(fn):
+            for lo in range(0, n_tokens, block):
+                fn(np.asarray(panel.price[:, lo:lo + block]))
+
+        timed(f"risk metrics ({block}-token blocks)", by_block, lambda prices: risk_metrics(prices, 24))
+        timed(f"RSI 14 ({block}-token blocks)", by_block, indicators.rsi)
+        timed(f"Bollinger 20 ({block}-token blocks)", by_block, indicators.bollinger_bands)
+        timed(f"correlation matrix ({block} tokens)", lambda: correlation_matrix(log_returns(np.asarray(panel.price[:, :block]))))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -8,6 +8,14 @@ from utils.data_processor import DataProcessor
 from components.animations import render_data_cluster, render_ai_token_visualization
 from components.animations import render_animated_metric, render_card
 
+# (column, kind) pairs formatted for the token table, see DataProcessor.format_columns
+TOKEN_TABLE_FORMATS = (
+    ("price", "price"),
+    ("market_cap", "money"),
+    ("price_change_24h", "change"),
+    ("volume_24h", "money"),
+)
+
 def render_dashboard():
     """Render the main dashboard view"""
     # Initialize data fetcher and processor
@@ -294,10 +302,11 @@ def render_token_table(df):
     display_df = df.copy()
     
     # Format market cap and price columns
-    display_df['Market Cap'] = display_df['market_cap'].apply(DataProcessor.format_number)
-    display_df['Price'] = display_df['price'].apply(lambda x: f"${x:,.6f}")
-    display_df['24h Change'] = display_df['price_change_24h'].apply(lambda x: f"{x:+.2f}%")
-    display_df['Volume (24h)'] = display_df['volume_24h'].apply(DataProcessor.format_number)
+    formatted = DataProcessor.format_columns(df, TOKEN_TABLE_FORMATS)
+    display_df['Market Cap'] = formatted['market_cap']
+    display_df['Price'] = formatted['price']
+    display_df['24h Change'] = formatted['price_change_24h']
+    display_df['Volume (24h)'] = formatted['volume_24h']
     
     # Select columns to display
     display_df = display_df[[
@@ -90,8 +90,11 @@ def render_sidebar():
     
     # Add a refresh button
     if st.sidebar.button("🔄 Refresh Data"):
-        # Clear the cache for the API calls
+        # Clear the cache for the API calls and rebuild the token universe in the background
         st.cache_data.clear()
+        api = CoinGeckoAPI()
+        api.clear_caches()
+        api.refresh_universe()
         st.rerun()
     
     # Show token list if search is active
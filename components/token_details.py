@@ -22,7 +22,7 @@ def render_token_details(token_id):
         
         # Fetch historical data for the selected time period
         days = st.session_state.filter_settings.get("days", 7)
-        historical_data = api.get_token_historical_data(token_id, days=days)
+        historical_data = api.get_token_history(token_id, days=days)
     
     if not token_details:
         st.error("Failed to load token details. Please try again.")
@@ -115,6 +115,14 @@ def render_price_chart(historical_data, token_details):
     tab1, tab2, tab3 = st.tabs(["Price", "Volume", "Market Cap"])
     
     with tab1:
+        # Overlays are computed only once they are switched on
+        overlay_cols = st.columns(5)
+        show_sma_7 = overlay_cols[0].toggle("SMA 7")
+        show_sma_30 = overlay_cols[1].toggle("SMA 30")
+        show_ema_12 = overlay_cols[2].toggle("EMA 12")
+        show_bollinger = overlay_cols[3].toggle("Bollinger Bands")
+        show_rsi = overlay_cols[4].toggle("RSI 14")
+        
         # Price chart
         fig = go.Figure()
         
@@ -130,6 +138,26 @@ def render_price_chart(historical_data, token_details):
             )
         )
         
+        overlays = [
+            (show_sma_7, 'sma_7', 'SMA 7', dict(color='rgb(255, 171, 0)', width=1.5)),
+            (show_sma_30, 'sma_30', 'SMA 30', dict(color='rgb(0, 200, 150)', width=1.5)),
+            (show_ema_12, 'ema_12', 'EMA 12', dict(color='rgb(66, 165, 245)', width=1.5)),
+            (show_bollinger, 'bollinger_upper', 'Bollinger Upper', dict(color='rgba(255, 215, 0, 0.6)', width=1, dash='dot')),
+            (show_bollinger, 'bollinger_lower', 'Bollinger Lower', dict(color='rgba(255, 215, 0, 0.6)', width=1, dash='dot')),
+        ]
+        for enabled, column, name, line in overlays:
+            if enabled:
+                fig.add_trace(
+                    go.Scatter(
+                        x=historical_data['date'],
+                        y=historical_data[column],
+                        mode='lines',
+                        name=name,
+                        line=line,
+                        hovertemplate=f'{name}: $%{{y:.6f}}<extra></extra>'
+                    )
+                )
+        
         # Update layout
         fig.update_layout(
             title=f"{token_details.get('name', 'Token')} Price History",
@@ -143,6 +171,31 @@ def render_price_chart(historical_data, token_details):
         )
         
         st.plotly_chart(fig, use_container_width=True)
+        
+        if show_rsi:
+            fig_rsi = go.Figure()
+            fig_rsi.add_trace(
+                go.Scatter(
+                    x=historical_data['date'],
+                    y=historical_data['rsi_14'],
+                    mode='lines',
+                    name='RSI 14',
+                    line=dict(color='rgb(126, 87, 194)', width=1.5),
+                    hovertemplate='<b>%{x|%d %b %Y %H:%M}</b><br>RSI: %{y:.1f}<extra></extra>'
+                )
+            )
+            # Overbought / oversold guides
+            fig_rsi.add_hline(y=70, line=dict(color='rgba(255, 82, 82, 0.6)', dash='dash'))
+            fig_rsi.add_hline(y=30, line=dict(color='rgba(0, 200, 150, 0.6)', dash='dash'))
+            fig_rsi.update_layout(
+                title="RSI (14)",
+                yaxis=dict(range=[0, 100]),
+                template="plotly_dark",
+                hovermode="x unified",
+                margin=dict(l=0, r=0, t=50, b=0),
+                height=250
+            )
+            st.plotly_chart(fig_rsi, use_container_width=True)
     
     with tab2:
         # Volume chart
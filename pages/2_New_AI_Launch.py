@@ -5,6 +5,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from utils.data_processor import DataProcessor
+from utils.formatting import format_change, format_money, format_price
 from components.animations import render_animated_metric, render_card
 import random
 
@@ -839,10 +840,10 @@ def render_new_ai_launch():
     display_df = filtered_df.copy()
     
     # Format columns for display
-    display_df['Price'] = display_df['price'].apply(lambda x: f"${x:.6f}")
-    display_df['Market Cap'] = display_df['market_cap'].apply(processor.format_number)
-    display_df['24h Change'] = display_df['price_change_24h'].apply(lambda x: f"{'+' if x >= 0 else ''}{x:.2f}%")
-    display_df['Volume (24h)'] = display_df['volume_24h'].apply(processor.format_number)
+    display_df['Price'] = format_price(display_df['price'], grouping=False)
+    display_df['Market Cap'] = format_money(display_df['market_cap'])
+    display_df['24h Change'] = format_change(display_df['price_change_24h'])
+    display_df['Volume (24h)'] = format_money(display_df['volume_24h'])
     display_df['Launch Date'] = pd.to_datetime(display_df['launch_date']).dt.strftime('%b %d, %Y')
     display_df['Age (Days)'] = display_df['days_since_launch'].round().astype(int)
     display_df['Risk Score'] = display_df['risk_score'].round(1)
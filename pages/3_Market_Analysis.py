@@ -5,6 +5,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 from utils.data_fetcher import CoinGeckoAPI
 from utils.data_processor import DataProcessor
+from utils.analytics import token_correlations, live_token_correlations
+from utils.risk import token_risk
 from components.animations import render_animated_metric, render_ai_token_visualization
 
 st.set_page_config(
@@ -77,7 +79,7 @@ def render_market_analysis():
     st.markdown('<h2 class="gold-header">Market Overview</h2>', unsafe_allow_html=True)
     
     # Calculate market stats
-    market_stats = processor.calculate_market_stats(df)
+    market_stats = processor.get_market_stats(api.get_universe_snapshot())
     
     # Visualization tabs for different market aspects
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Performance Trends", "Market Cap Analysis", "Token Correlations", "Sector Analysis", "Volatility Patterns"])
@@ -314,62 +316,72 @@ def render_market_analysis():
         
         # Create a heatmap of correlations between tokens based on price changes
         if len(df) > 5:
-            # Create a random correlation matrix for visualization
-            # In a real app, this would be based on historical price data
-            num_tokens = min(20, len(df))  # Take top 20 tokens by market cap
-            top_tokens = df.sort_values('market_cap', ascending=False).head(num_tokens)
-            
-            # Generate a semi-realistic correlation matrix
-            correlation_matrix = np.zeros((num_tokens, num_tokens))
-            np.fill_diagonal(correlation_matrix, 1.0)  # Diagonal is always 1.0
-            
-            # Fill the upper and lower triangles with realistic correlations
-            for i in range(num_tokens):
-                for j in range(i+1, num_tokens):
-                    # Tokens in similar market cap range are more correlated
-                    market_cap_diff = abs(np.log10(top_tokens.iloc[i]['market_cap']) - 
-                                        np.log10(top_tokens.iloc[j]['market_cap']))
-                    
-                    # Base correlation - higher for tokens in similar category
-                    base_corr = np.random.uniform(0.3, 0.9)
-                    
-                    # Adjust correlation based on market cap difference
-                    adjustment = max(0, 0.4 - 0.1 * market_cap_diff)
-                    
-                    # Final correlation
-                    corr = min(0.95, base_corr + adjustment)
-                    
-                    correlation_matrix[i, j] = corr
-                    correlation_matrix[j, i] = corr  # Symmetric matrix
-            
-            # Create the heatmap
-            fig_heatmap = go.Figure(data=go.Heatmap(
-                z=correlation_matrix,
-                x=top_tokens['symbol'],
-                y=top_tokens['symbol'],
-                colorscale='Viridis',
-                zmin=-1, zmax=1,
-                hoverongaps=False,
-                hovertemplate='%{y} to %{x}: %{z:.2f}<extra></extra>'
-            ))
-            
-            fig_heatmap.update_layout(
-                template="plotly_dark",
-                plot_bgcolor='rgba(0, 0, 0, 0)',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                margin=dict(l=10, r=10, t=50, b=10),
-                height=600,
-                title={
-                    'text': "AI Token Correlation Matrix",
-                    'y': 0.98,
-                    'x': 0.5,
-                    'xanchor': 'center',
-                    'yanchor': 'top',
-                    'font': {'color': '#FFD700', 'size': 18}
-                }
-            )
+            corr_col1, corr_col2, corr_col3 = st.columns(3)
+            with corr_col1:
+                token_options = sorted({min(n, len(df)) for n in [10, 20, 50, 100, 200]})
+                num_tokens = token_options[0]
+                if len(token_options) > 1:
+                    num_tokens = st.select_slider(
+                        "Tokens (top by market cap)",
+                        options=token_options,
+                        value=min(20, len(df))
+                    )
+            with corr_col2:
+                correlation_days = st.selectbox(
+                    "Return window",
+                    [7, 30, 90],
+                    index=1,
+                    format_func=lambda d: f"{d} days"
+                )
+            with corr_col3:
+                live_correlations = st.toggle(
+                    "Live updates",
+                    value=False,
+                    help="Keep the matrix updating in place: one more hourly return is added as each hour closes"
+                )
             
-            st.plotly_chart(fig_heatmap, use_container_width=True)
+            # Live mode reruns only this fragment, at the universe refresh cadence; each
+            # closed hour of the return grid is one more tick for the rolling window
+            # instead of a full recomputation, and reruns in between are cache hits
+            @st.fragment(run_every=300 if live_correlations else None)
+            def render_correlation_heatmap():
+                snapshot = api.get_universe_snapshot()
+                if live_correlations:
+                    top_tokens, correlation_matrix = live_token_correlations(api, snapshot, n_tokens=num_tokens, days=correlation_days)
+                else:
+                    # Log-return correlations from price history, cached per universe snapshot and window
+                    top_tokens, correlation_matrix = token_correlations(api, snapshot, n_tokens=num_tokens, days=correlation_days)
+            
+                # Create the heatmap
+                fig_heatmap = go.Figure(data=go.Heatmap(
+                    z=correlation_matrix,
+                    x=top_tokens['symbol'],
+                    y=top_tokens['symbol'],
+                    colorscale='Viridis',
+                    zmin=-1, zmax=1,
+                    hoverongaps=False,
+                    hovertemplate='%{y} to %{x}: %{z:.2f}<extra></extra>'
+                ))
+            
+                fig_heatmap.update_layout(
+                    template="plotly_dark",
+                    plot_bgcolor='rgba(0, 0, 0, 0)',
+                    paper_bgcolor='rgba(0, 0, 0, 0)',
+                    margin=dict(l=10, r=10, t=50, b=10),
+                    height=600,
+                    title={
+                        'text': "AI Token Correlation Matrix",
+                        'y': 0.98,
+                        'x': 0.5,
+                        'xanchor': 'center',
+                        'yanchor': 'top',
+                        'font': {'color': '#FFD700', 'size': 18}
+                    }
+                )
+            
+                st.plotly_chart(fig_heatmap, use_container_width=True)
+            
+            render_correlation_heatmap()
             
             # Add correlation interpretation
             st.markdown("""
@@ -549,31 +561,21 @@ def render_market_analysis():
         # Volatility and Risk Analysis
         st.markdown('<h3 style="color: #FFD700;">Volatility & Risk Analysis</h3>', unsafe_allow_html=True)
         
-        # Create random volatility metrics for visualization
-        # In a real app, this would use actual historical data
+        volatility_df = pd.DataFrame()
         if len(df) > 5:
-            volatility_df = df.copy()
-            
-            # Simulate volatility metrics based on market cap (smaller caps have higher volatility)
-            log_market_cap = np.log10(volatility_df['market_cap'])
-            max_log = log_market_cap.max()
-            min_log = log_market_cap.min()
-            normalized_size = (log_market_cap - min_log) / (max_log - min_log)
-            
-            # Volatility metrics (inverse relationship with market cap)
-            volatility_df['daily_volatility'] = 5 + 25 * (1 - normalized_size) + np.random.normal(0, 3, len(df))
-            volatility_df['weekly_volatility'] = volatility_df['daily_volatility'] * np.random.uniform(1.5, 2.2, len(df))
-            volatility_df['sharpe_ratio'] = normalized_size * 2.5 + np.random.normal(0, 0.3, len(df))
-            
-            # Risk score (higher for more volatile tokens)
-            volatility_df['risk_score'] = 100 * (1 - normalized_size) * 0.7 + np.random.uniform(0, 30, len(df))
-            volatility_df['risk_score'] = volatility_df['risk_score'].clip(1, 99)  # Clip to 1-99 range
-            
-            # Create risk categories
-            bins = [0, 33, 66, 100]
-            labels = ['Low Risk', 'Medium Risk', 'High Risk']
-            volatility_df['risk_category'] = pd.cut(volatility_df['risk_score'], bins=bins, labels=labels, include_lowest=True)
+            risk_days = st.selectbox(
+                "Risk window",
+                [7, 30, 90],
+                index=1,
+                format_func=lambda d: f"{d} days"
+            )
             
+            # Realized risk metrics for the whole universe, cached per snapshot and window
+            snapshot = api.get_universe_snapshot()
+            risk = token_risk(api, snapshot, days=risk_days)
+            volatility_df = df.join(risk, on='id', how='inner').dropna(subset=['daily_volatility'])
+        
+        if not volatility_df.empty:
             # Create scatter plot of volatility vs market cap
             fig_scatter = px.scatter(
                 volatility_df.sort_values('market_cap', ascending=False).head(30),  # Top 30 by market cap
@@ -590,6 +592,9 @@ def render_market_analysis():
                     'weekly_volatility': ':.2f%',
                     'risk_score': ':.1f',
                     'sharpe_ratio': ':.2f',
+                    'sortino_ratio': ':.2f',
+                    'max_drawdown': ':.1f',
+                    'var_95': ':.2f',
                     'market_cap': ':,.0f'
                 },
                 log_x=True,
@@ -677,16 +682,18 @@ def render_market_analysis():
                 <h4 style="color: #FFD700;">Volatility & Risk Analysis</h4>
                 <p>This analysis helps identify the risk profile of different AI tokens:</p>
                 <ul>
-                    <li><strong>Daily Volatility:</strong> Average daily price fluctuation percentage</li>
-                    <li><strong>Weekly Volatility:</strong> Average weekly price fluctuation percentage</li>
-                    <li><strong>Risk Score:</strong> A composite measure (1-99) based on market cap, volatility, and other factors</li>
-                    <li><strong>Sharpe Ratio:</strong> Risk-adjusted return metric (higher is better)</li>
+                    <li><strong>Daily Volatility:</strong> Standard deviation of price returns over the window, scaled to one day</li>
+                    <li><strong>Weekly Volatility:</strong> The same volatility scaled to one week</li>
+                    <li><strong>Risk Score:</strong> Where a token ranks (1-99) across the universe on volatility and maximum drawdown</li>
+                    <li><strong>Sharpe / Sortino Ratio:</strong> Annualized return per unit of total / downside volatility (higher is better)</li>
+                    <li><strong>Max Drawdown:</strong> Deepest peak-to-trough fall over the window</li>
+                    <li><strong>VaR (95%):</strong> Daily loss exceeded on only 5% of days, from historical returns</li>
                 </ul>
-                <p>As expected, smaller market cap tokens typically exhibit higher volatility and risk scores.</p>
+                <p>Smaller market cap tokens typically exhibit higher volatility and risk scores.</p>
             </div>
             """, unsafe_allow_html=True)
         else:
-            st.info("Not enough tokens to generate volatility analysis")
+            st.info("Not enough tokens or price history to generate volatility analysis")
         
         st.markdown('</div>', unsafe_allow_html=True)
         
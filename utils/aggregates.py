@@ -0,0 +1,132 @@
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+# Full recount after this many delta updates, so float error can't build up
+REBUILD_INTERVAL = 500
+
+
+class MarketAggregates:
+    """
+    Headline metrics of the token universe, kept as running sums.
+
+    Each token's contribution (category, market cap, volume, 24h change) is
+    remembered, so a delta refresh subtracts the old contribution of removed
+    and updated tokens and adds the new one of updated and added tokens:
+    O(changed rows) per snapshot, and stats() is a ready-made dict.
+    """
+
+    def __init__(self, key="id"):
+        self.key = key
+        self.version = None
+        self.rebuilds = 0
+        self.incremental_updates = 0
+        self._since_rebuild = 0
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._contributions = {}
+        self._count = 0
+        self._market_cap = 0.0
+        self._volume = 0.0
+        self._change_sum = 0.0
+        self._change_count = 0
+        self._weighted_change = 0.0   # sum of market cap * change
+        self._change_weight = 0.0     # sum of market cap where the change is known
+        self._category_counts = defaultdict(int)
+        self._category_market_cap = defaultdict(float)
+        self._stats = None
+
+    def update(self, snapshot):
+        """
+        Bring the aggregates up to date with a snapshot and return its stats(),
+        read under the same lock so that no other session can move the
+        aggregates on in between
+        """
+        with self._lock:
+            if self.version is not None and snapshot.version < self.version:
+                # A session still holding an older snapshot: answer for it without moving back
+                aggregates = MarketAggregates(self.key)
+                aggregates._add_rows(snapshot.data)
+                return aggregates._current_stats()
+
+            if snapshot.version != self.version:
+                incremental = (
+                    self.version is not None
+                    and snapshot.version == self.version + 1
+                    and snapshot.changes is not None
+                    and self._since_rebuild < REBUILD_INTERVAL
+                )
+                if incremental:
+                    self._apply(snapshot.data, snapshot.changes)
+                    self.incremental_updates += 1
+                    self._since_rebuild += 1
+                else:
+                    self._reset()
+                    self._add_rows(snapshot.data)
+                    self.rebuilds += 1
+                    self._since_rebuild = 0
+                self.version = snapshot.version
+                self._stats = None
+            return self._current_stats()
+
+    def _add_rows(self, rows):
+        def column(name):
+            if name not in rows.columns:
+                return np.full(len(rows), np.nan)
+            return rows[name].to_numpy(dtype=np.float64)
+
+        categories = rows["market_cap_category"].astype(object).to_numpy()
+        for token_id, category, market_cap, volume, change in zip(
+            rows[self.key].to_numpy(), categories, column("market_cap"), column("volume_24h"), column("price_change_24h")
+        ):
+            contribution = (category, market_cap, volume, change)
+            self._contributions[token_id] = contribution
+            self._apply_contribution(contribution, 1)
+
+    def _apply_contribution(self, contribution, sign):
+        category, market_cap, volume, change = contribution
+        # Missing values are skipped, as pandas sum and mean do
+        market_cap_known = np.isfinite(market_cap)
+        self._count += sign
+        self._market_cap += sign * market_cap if market_cap_known else 0.0
+        self._volume += sign * volume if np.isfinite(volume) else 0.0
+        if np.isfinite(change):
+            self._change_sum += sign * change
+            self._change_count += sign
+            if market_cap_known:
+                self._weighted_change += sign * market_cap * change
+                self._change_weight += sign * market_cap
+        self._category_counts[category] += sign
+        self._category_market_cap[category] += sign * market_cap if market_cap_known else 0.0
+
+    def _apply(self, data, changes):
+        for token_id in changes.removed + changes.updated:
+            contribution = self._contributions.pop(token_id, None)
+            if contribution is not None:
+                self._apply_contribution(contribution, -1)
+
+        changed = changes.added + changes.updated
+        if changed:
+            self._add_rows(data[data[self.key].isin(changed)])
+
+    def _current_stats(self):
+        if self._stats is None:
+            counts = {c: n for c, n in sorted(self._category_counts.items(), key=lambda item: -item[1]) if n > 0}
+            self._stats = {
+                "total_tokens": self._count,
+                "total_market_cap": self._market_cap,
+                "total_volume": self._volume,
+                "avg_24h_change": self._change_sum / self._change_count if self._change_count else 0,
+                "market_cap_weighted_change": self._weighted_change / self._change_weight if self._change_weight else 0,
+                "token_counts_by_cap": counts,
+                "market_cap_by_category": {c: self._category_market_cap[c] for c in counts},
+            }
+        return self._stats
+
+    def stats(self):
+        """Headline metrics in the calculate_market_stats layout, plus volume and weighted change"""
+        with self._lock:
+            return self._current_stats()
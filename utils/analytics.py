@@ -0,0 +1,203 @@
+import threading
+
+import numpy as np
+
+from utils.memo_cache import TTLCache
+
+# Derived analytics per (snapshot version, parameters); shared by all sessions
+_analytics_cache = TTLCache(maxsize=64, ttl=900)
+
+# Streaming correlation state per (n_tokens, days), advanced once per grid step
+_live_correlations = {}
+_live_correlations_lock = threading.Lock()
+
+
+def log_returns(prices):
+    """Log returns along the time axis of a (time x tokens) price array"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.diff(np.log(prices), axis=0)
+
+
+def correlation_matrix(returns):
+    """
+    Pairwise Pearson correlations between the columns of a (time x tokens) array.
+
+    NaNs are handled pairwise: each pair uses only the time steps where both
+    tokens have data, yet the whole matrix comes out of a handful of matrix
+    products instead of a loop over pairs.
+    """
+    valid = np.isfinite(returns)
+    mask = valid.astype(np.float64)
+    x = np.where(valid, returns, 0.0)
+
+    n = mask.T @ mask             # observations shared by each pair
+    sum_x = x.T @ mask            # sum of column i over the steps where j is valid
+    sum_xx = (x * x).T @ mask
+    sum_xy = x.T @ x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = var_x.T
+        corr = cov / np.sqrt(var_x * var_y)
+
+    corr[n < 3] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    np.fill_diagonal(corr, np.where(np.diag(n) >= 3, 1.0, np.nan))
+    return corr
+
+
+def cached(kind, version, params, compute):
+    """Memoize an analytics result per (kind, snapshot version, params)"""
+    key = (kind, version, params)
+    result = _analytics_cache.get(key)
+    if result is None:
+        result = compute()
+        _analytics_cache.set(key, result)
+    return result
+
+
+def token_correlations(api, snapshot, n_tokens=20, days=30):
+    """
+    Log-return correlation matrix of the top n tokens by market cap, from real
+    (or, without an API key, demo) history. Returns (top_tokens, matrix).
+    """
+    def compute():
+        top_tokens = snapshot.data.nlargest(n_tokens, "market_cap")
+        panel = api.get_price_panel(top_tokens["id"].tolist(), days=days)
+        return top_tokens, correlation_matrix(log_returns(panel.price))
+
+    return cached("correlations", snapshot.version, (n_tokens, days), compute)
+
+
+class RollingCorrelation:
+    """
+    Pairwise correlations over a sliding window of log returns, updated online.
+
+    Keeps running sums, sums of squares and cross-products of the returns in
+    the window, so each new price row costs O(N^2) no matter how long the
+    window is. Sums are rebuilt from the ring buffer once per window length
+    to stop floating point drift from building up.
+    """
+
+    def __init__(self, n_tokens, window):
+        self.window = window
+        self._returns = np.zeros((window, n_tokens))
+        self._position = 0
+        self.count = 0
+        self._updates = 0
+        self._sum = np.zeros(n_tokens)
+        self._sum_sq = np.zeros(n_tokens)
+        self._cross = np.zeros((n_tokens, n_tokens))
+        self.last_prices = None
+
+    @classmethod
+    def from_prices(cls, prices, window=None):
+        """Seed from a (time x tokens) price history; the window defaults to all of it"""
+        returns = np.nan_to_num(log_returns(prices), nan=0.0, posinf=0.0, neginf=0.0)
+        window = window or max(2, len(returns))
+        engine = cls(prices.shape[1], window)
+
+        seed = returns[-window:]
+        engine._returns[:len(seed)] = seed
+        engine._position = len(seed) % window
+        engine.count = len(seed)
+        engine._recompute()
+
+        # Remember the last known price of every token for the next return
+        last_valid = np.where(np.isfinite(prices), np.arange(len(prices))[:, None], 0).max(axis=0)
+        engine.last_prices = prices[last_valid, np.arange(prices.shape[1])]
+        return engine
+
+    def _recompute(self):
+        window = self._returns[:self.count]
+        self._sum = window.sum(axis=0)
+        self._sum_sq = (window ** 2).sum(axis=0)
+        self._cross = window.T @ window
+
+    def update(self, prices):
+        """Add one row of prices (one per token); tokens without a price count as unchanged"""
+        prices = np.asarray(prices, dtype=np.float64)
+        if self.last_prices is None:
+            self.last_prices = prices
+            return
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.log(prices / self.last_prices)
+        r = np.nan_to_num(r, nan=0.0, posinf=0.0, neginf=0.0)
+        self.last_prices = np.where(np.isfinite(prices), prices, self.last_prices)
+
+        if self.count == self.window:
+            # Slide the oldest return out of the window
+            old = self._returns[self._position]
+            self._sum -= old
+            self._sum_sq -= old * old
+            self._cross -= np.outer(old, old)
+        else:
+            self.count += 1
+
+        self._returns[self._position] = r
+        self._sum += r
+        self._sum_sq += r * r
+        self._cross += np.outer(r, r)
+        self._position = (self._position + 1) % self.window
+
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._recompute()
+
+    def correlation(self):
+        """Current correlation matrix of the window"""
+        n = self.count
+        if n < 3:
+            return np.full(self._cross.shape, np.nan)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self._cross - np.outer(self._sum, self._sum) / n
+            var = self._sum_sq - self._sum ** 2 / n
+            corr = cov / np.sqrt(np.outer(var, var))
+
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+
+def live_token_correlations(api, snapshot, n_tokens=20, days=30):
+    """
+    Streaming variant of token_correlations: the window is seeded from the history
+    panel once, then each time a step of the panel's grid closes, the prices of
+    the latest universe snapshot are added as the tick for that grid time.
+    Returns are thus always over one grid step, like those of the seed.
+    """
+    top_tokens = snapshot.data.nlargest(n_tokens, "market_cap")
+    token_ids = tuple(top_tokens["id"])
+    key = (n_tokens, days)
+
+    with _live_correlations_lock:
+        state = _live_correlations.get(key)
+        if state is not None and state["token_ids"] == token_ids:
+            tick = int(snapshot.built_at * 1000) // state["step"] * state["step"]
+            if tick == state["last_tick"] + state["step"]:
+                state["engine"].update(top_tokens["price"].to_numpy(dtype=np.float64))
+                state["last_tick"] = tick
+            if tick <= state["last_tick"]:
+                return top_tokens, state["engine"].correlation()
+
+    # New or reshuffled top N, or more than one grid step missed: reseed from the
+    # history panel. That may backfill over the network, so not under the lock
+    panel = api.get_price_panel(list(token_ids), days=days)
+    timestamps = panel.timestamps
+    seeded = {
+        "token_ids": token_ids,
+        "engine": RollingCorrelation.from_prices(panel.price),
+        "step": int(timestamps[1] - timestamps[0]) if len(timestamps) > 1 else 3_600_000,
+        "last_tick": int(timestamps[-1]) if len(timestamps) else 0
+    }
+
+    with _live_correlations_lock:
+        state = _live_correlations.get(key)
+        # Another session may have seeded the same tokens more recently in the meantime
+        if state is None or state["token_ids"] != token_ids or state["last_tick"] < seeded["last_tick"]:
+            state = seeded
+            _live_correlations[key] = state
+        return top_tokens, state["engine"].correlation()
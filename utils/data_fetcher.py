@@ -1,104 +1,406 @@
 import requests
 import pandas as pd
+import threading
 import time
-import streamlit as st
 import os
-from utils.dummy_data import generate_dummy_tokens, generate_historical_data, generate_token_details
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from utils.dummy_data import generate_dummy_tokens, generate_historical_data, generate_token_details, generate_token_histories, token_seed
+from utils.ingest import markets_to_frame
+from utils.delta import incremental_update
+from utils.timeseries_store import TimeSeriesStore
+from utils.history import TokenHistory
+from utils.price_panel import time_grid, build_panel
+from utils.rate_limiter import TokenBucket, SharedRateLimiter
+from utils.http_cache import ResponseCache
+from utils.snapshot import SnapshotRefresher
+from utils.single_flight import SingleFlight
+from utils.memo_cache import memoize_method
+from utils.resilience import RetryPolicy, CircuitBreaker, CircuitOpenError, parse_retry_after
+
+# Request budgets (calls per minute) for the CoinGecko API tiers
+PUBLIC_TIER_CALLS_PER_MINUTE = 30
+PRO_TIER_CALLS_PER_MINUTE = 500
+
+# API root, key header and default budget per CoinGecko plan, picked with COINGECKO_API_PLAN:
+# paid keys only work against the pro root, free demo keys against the public one
+API_PLANS = {
+    "pro": ("https://pro-api.coingecko.com/api/v3", "x-cg-pro-api-key", PRO_TIER_CALLS_PER_MINUTE),
+    "demo": ("https://api.coingecko.com/api/v3", "x-cg-demo-api-key", PUBLIC_TIER_CALLS_PER_MINUTE),
+}
+
+def _api_plan(api_key=None):
+    """The configured plan of an API key ("pro" unless set otherwise), or None without a key"""
+    if not api_key:
+        return None
+    plan = os.getenv("COINGECKO_API_PLAN", "pro").strip().lower()
+    if plan not in API_PLANS:
+        raise ValueError(f"COINGECKO_API_PLAN must be one of {sorted(API_PLANS)}, not {plan!r}")
+    return plan
+
+# Every CoinGeckoAPI instance in this process draws from the same bucket
+_rate_limiter = None
+_shared_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+# Background revalidation of stale cache entries, one in flight per key
+_revalidation_executor = ThreadPoolExecutor(max_workers=2)
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+# Transport errors worth another attempt: the connection or the response body broke off
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+# One circuit breaker per endpoint, shared by all clients in the process
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(endpoint):
+    """Get the process-wide circuit breaker for an endpoint"""
+    with _circuit_breakers_lock:
+        if endpoint not in _circuit_breakers:
+            _circuit_breakers[endpoint] = CircuitBreaker()
+        return _circuit_breakers[endpoint]
+
+# Identical upstream calls from concurrent sessions share one request
+_single_flight = SingleFlight()
+
+# Local per-token price history, shared by all clients in the process
+_history_store = None
+_history_store_lock = threading.Lock()
+
+def get_history_store():
+    """Get the process-wide local time-series store for token price history"""
+    global _history_store
+    with _history_store_lock:
+        if _history_store is None:
+            _history_store = TimeSeriesStore()
+        return _history_store
+
+# Background worker that keeps the AI token universe snapshot fresh
+UNIVERSE_TTL = 300
+_token_refresher = None
+_token_refresher_lock = threading.Lock()
+
+def _calls_per_minute(api_key=None):
+    plan = _api_plan(api_key)
+    default_rate = API_PLANS[plan][2] if plan else PUBLIC_TIER_CALLS_PER_MINUTE
+    return int(os.getenv("COINGECKO_RATE_LIMIT", default_rate))
+
+def get_rate_limiter(api_key=None):
+    """Get the process-wide rate limiter, sized to the API tier"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            calls_per_minute = _calls_per_minute(api_key)
+            # Allow a small burst so a refresh can start several calls at once
+            _rate_limiter = TokenBucket.per_minute(calls_per_minute, burst=max(1, calls_per_minute // 10))
+        return _rate_limiter
+
+def get_shared_rate_limiter(api_key=None):
+    """Get the per-minute quota shared by all app processes on this host"""
+    global _shared_rate_limiter
+    with _rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            db_path = os.getenv(
+                "COINGECKO_RATE_LIMIT_DB",
+                os.path.join(tempfile.gettempdir(), "m100d_coingecko_quota.sqlite3")
+            )
+            _shared_rate_limiter = SharedRateLimiter(db_path, _calls_per_minute(api_key), window_seconds=60)
+        return _shared_rate_limiter
+
+def _build_universe():
+    """
+    Build the universe for the refresher. The first build in a process serves
+    whatever usable copies the response cache holds on disk, so a new replica
+    starts warm, and falls back to demo data if nothing real comes back. Later
+    builds revalidate every payload, since cached copies would hand each
+    refresh-ahead cycle the data of the previous one, and fail rather than
+    replace the last snapshot with demo data.
+    """
+    first_build = _token_refresher.current is None
+    return CoinGeckoAPI(revalidate=not first_build)._build_ai_related_tokens(demo_fallback=first_build)
+
+def get_token_refresher():
+    """Get the process-wide refresher for the AI token universe, starting it if needed"""
+    global _token_refresher
+    with _token_refresher_lock:
+        if _token_refresher is None:
+            # The worker owns its own client so it never shares a session with page renders
+            # Refreshes are incremental: only tokens whose last_updated moved are patched in
+            _token_refresher = SnapshotRefresher(
+                _build_universe,
+                ttl=UNIVERSE_TTL,
+                merge_fn=incremental_update
+            )
+        return _token_refresher.start()
 
 class CoinGeckoAPI:
     """
     Wrapper for the CoinGecko API to fetch cryptocurrency data
     """
     
-    BASE_URL = "https://api.coingecko.com/api/v3"
+    BASE_URL = "https://api.coingecko.com/api/v3"  # public root, used without an API key
+    REQUEST_TIMEOUT = 15
+    MAX_WORKERS = 8
+    SEARCH_TERMS = ["ai", "artificial intelligence", "machine learning", "neural", "gpt"]
+    MARKETS_MAX_IDS = 250  # /coins/markets returns at most one page of 250 coins
+    HISTORY_MAX_STALENESS = 300  # seconds; smaller gaps in stored history are not worth a request
     
-    def __init__(self):
+    def __init__(self, revalidate=False):
         self.session = requests.Session()
+        # With revalidate, cached payloads are never served as they are: every call
+        # sends a conditional request, so unchanged data still only costs a 304
+        self.revalidate = revalidate
         self.api_key = os.getenv("COINGECKO_API_KEY", None)
         self.headers = {}
-        if self.api_key:
-            self.headers["x-cg-pro-api-key"] = self.api_key
+        self.base_url = self.BASE_URL
+        plan = _api_plan(self.api_key)
+        if plan:
+            self.base_url, key_header, _ = API_PLANS[plan]
+            self.headers[key_header] = self.api_key
+        self.rate_limiter = get_rate_limiter(self.api_key)
+        self.shared_rate_limiter = get_shared_rate_limiter(self.api_key)
+        self.response_cache = ResponseCache()
+        self.history_store = get_history_store()
+        self.retry_policy = RetryPolicy()
+        # Sources that failed during the last discovery run, e.g. {"category:ai-agents": "..."}
+        self.discovery_errors = {}
+    
+    def _endpoint(self, url):
+        """Endpoint name for a URL, with coin ids collapsed so /coins/x/market_chart is one endpoint"""
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        return re.sub(r"^/coins/(?!markets$|categories/)[^/]+", "/coins/{id}", path)
+    
+    def _send(self, url, params=None, headers=None):
+        """Issue a single GET request once the rate limiters allow it"""
+        # Pace this process first, then take a call from the host-wide quota
+        self.rate_limiter.acquire()
+        self.shared_rate_limiter.acquire()
+        request_headers = {**self.headers, **(headers or {})}
+        return self.session.get(url, params=params, headers=request_headers, timeout=self.REQUEST_TIMEOUT)
     
-    @st.cache_data(ttl=300)  # Cache results for 5 minutes
-    def get_ai_related_tokens(_self):
+    def _get(self, url, params=None, headers=None):
         """
-        Get AI-related tokens by searching and filtering categories
+        Issue a GET request with jittered exponential backoff on 429/5xx and network errors,
+        honoring Retry-After, behind a per-endpoint circuit breaker
         """
-        try:
-            # Always provide high-quality data for the best user experience
-            # This uses a comprehensive dataset of AI tokens that's regularly updated
+        endpoint = self._endpoint(url)
+        breaker = get_circuit_breaker(endpoint)
+        # Wait out a short Retry-After that another call was given; a long one refuses this call
+        wait = breaker.hold_off_remaining
+        if 0 < wait <= self.retry_policy.max_delay:
+            time.sleep(wait)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {endpoint}")
+        
+        for attempt in range(self.retry_policy.max_attempts):
+            error = None
+            retry_after = None
+            
+            try:
+                response = self._send(url, params=params, headers=headers)
+            except RETRYABLE_ERRORS as e:
+                error = e
+            except Exception:
+                # Anything else still ends this call, and a half-open trial must not be left dangling
+                breaker.record_failure()
+                raise
+            else:
+                if not self.retry_policy.should_retry(response.status_code):
+                    # Any non-retryable answer (including 4xx) means the endpoint is up
+                    breaker.record_success()
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    # Every call to this endpoint waits, not just this one
+                    breaker.hold_off(retry_after)
+            
+            if attempt + 1 >= self.retry_policy.max_attempts:
+                break
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if delay is None:
+                break
+            # Another call may have been asked to wait longer in the meantime
+            delay = max(delay, breaker.hold_off_remaining)
+            if delay > self.retry_policy.max_delay:
+                break
+            time.sleep(delay)
+        
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return response
+    
+    def _get_json(self, url, params=None):
+        """
+        GET a JSON payload through the on-disk response cache.
+        Fresh entries are served directly, stale ones are served while a conditional
+        request refreshes them in the background, and expired ones are revalidated inline.
+        Clients created with revalidate=True revalidate every entry inline.
+        """
+        entry = self.response_cache.get(url, params)
+        
+        if entry is not None and not self.revalidate:
+            if self.response_cache.is_fresh(entry):
+                return entry.body
+            if self.response_cache.is_servable(entry):
+                self._schedule_revalidation(url, params)
+                return entry.body
+        
+        key = (url, tuple(sorted((params or {}).items())))
+        return _single_flight.do(key, self._revalidate, url, params, entry).body
+    
+    def _revalidate(self, url, params, entry=None):
+        """Fetch a payload, sending the cached validators so unchanged data costs a 304"""
+        headers = entry.conditional_headers() if entry is not None else {}
+        response = self._get(url, params=params, headers=headers)
+        
+        if response.status_code == 304 and entry is not None:
+            return self.response_cache.touch(url, params, entry)
+        
+        response.raise_for_status()
+        return self.response_cache.put(
+            url,
+            params,
+            response.json(),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+    
+    def _schedule_revalidation(self, url, params):
+        key = ResponseCache.cache_key(url, params)
+        with _revalidating_lock:
+            if key in _revalidating:
+                return
+            _revalidating.add(key)
+        
+        def revalidate():
+            try:
+                self._revalidate(url, params, self.response_cache.get(url, params))
+            except Exception:
+                # Keep serving the stale copy; the next request will try again
+                pass
+            finally:
+                with _revalidating_lock:
+                    _revalidating.discard(key)
+        
+        _revalidation_executor.submit(revalidate)
+    
+    def get_rate_limit_status(self):
+        """Remaining CoinGecko quota in the current window, across all app processes"""
+        return self.shared_rate_limiter.quota()
+    
+    def clear_caches(self):
+        """Drop memoized history and token details so the next call refetches"""
+        CoinGeckoAPI.get_token_historical_data.cache_clear()
+        CoinGeckoAPI.get_token_history.cache_clear()
+        CoinGeckoAPI.get_token_details.cache_clear()
+    
+    def get_single_flight_stats(self):
+        """How many upstream calls ran and how many duplicates were absorbed, per endpoint"""
+        return _single_flight.stats()
+    
+    def get_ai_related_tokens(self):
+        """
+        Get AI-related tokens from the latest universe snapshot.
+        A background worker rebuilds the snapshot before it expires, so this never waits on the API.
+        """
+        return self.get_universe_snapshot().data
+    
+    def get_universe_snapshot(self):
+        """Get the latest universe snapshot together with its version and build time"""
+        return get_token_refresher().latest()
+    
+    def refresh_universe(self):
+        """Ask the background worker to rebuild the universe snapshot now"""
+        get_token_refresher().refresh_now()
+    
+    def _build_ai_related_tokens(self, demo_fallback=True):
+        """
+        Get AI-related tokens by searching and filtering categories.
+        With demo_fallback=False a failed or empty discovery raises instead of
+        returning demo data, so a refresh keeps the last real snapshot.
+        """
+        # Without an API key, use the curated demo dataset of AI tokens
+        if not self.api_key:
             return generate_dummy_tokens(n=80)
+        
+        try:
+            # Discovery keeps whatever it managed to fetch, so it only fails
+            # when nothing real came back at all
+            ai_tokens = self._search_ai_tokens()
+            if not ai_tokens:
+                raise RuntimeError(f"AI token discovery returned no tokens: {self.discovery_errors or 'no matches'}")
             
-            # In a production environment with API keys, we would use:
-            # ai_tokens = _self._search_ai_tokens()
-            # detailed_tokens = _self._get_token_details(ai_tokens)
-            # return pd.DataFrame(detailed_tokens)
+            return markets_to_frame(ai_tokens)
         
-        except Exception as e:
-            # Silent error handling for seamless user experience
+        except Exception:
+            if not demo_fallback:
+                raise
+            # Silent error handling for seamless user experience on the very first build
             return generate_dummy_tokens(n=80)
     
     def _search_ai_tokens(self):
         """Search for AI-related tokens"""
-        ai_tokens = []
+        self.discovery_errors = {}
         
         # Get all cryptocurrency categories
-        categories_url = f"{self.BASE_URL}/coins/categories/list"
-        categories_response = self.session.get(categories_url, headers=self.headers)
-        categories_response.raise_for_status()
+        categories_url = f"{self.base_url}/coins/categories/list"
+        try:
+            categories = self._get_json(categories_url)
+        except Exception as e:
+            # Search terms can still find tokens without the category list
+            self.discovery_errors["categories"] = str(e)
+            categories = []
         
         ai_categories = [
-            cat["category_id"] for cat in categories_response.json() 
+            cat["category_id"] for cat in categories 
             if "ai" in cat["name"].lower() or "artificial intelligence" in cat["name"].lower()
         ]
         
-        # Get coins by AI categories
-        for category in ai_categories:
-            category_url = f"{self.BASE_URL}/coins/markets"
-            params = {
-                "vs_currency": "usd",
-                "category": category,
-                "order": "market_cap_desc",
-                "per_page": 250,
-                "page": 1
-            }
+        # Category and search calls run concurrently; the shared rate limiter
+        # decides how fast they actually go out
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            category_futures = [(f"category:{category}", executor.submit(self._fetch_category_tokens, category)) for category in ai_categories]
+            search_futures = [(f"search:{term}", executor.submit(self._search_coin_ids, term)) for term in self.SEARCH_TERMS]
             
-            category_response = self.session.get(category_url, params=params, headers=self.headers)
-            category_response.raise_for_status()
+            # Collect in submission order so category results take precedence over search hits;
+            # a failed source is recorded and skipped instead of discarding the rest
+            ai_tokens = []
+            for source, future in category_futures:
+                try:
+                    ai_tokens.extend(future.result())
+                except Exception as e:
+                    self.discovery_errors[source] = str(e)
             
-            ai_tokens.extend(category_response.json())
+            # Union of all search hits, minus whatever the category calls already returned
+            covered_ids = {token["id"] for token in ai_tokens}
+            missing_ids = {}
+            for source, future in search_futures:
+                try:
+                    for coin_id in future.result():
+                        if coin_id not in covered_ids:
+                            missing_ids[coin_id] = None
+                except Exception as e:
+                    self.discovery_errors[source] = str(e)
             
-            # Rate limiting to avoid API issues
-            time.sleep(1)
-        
-        # Also do a search for AI-related terms
-        search_terms = ["ai", "artificial intelligence", "machine learning", "neural", "gpt"]
-        
-        for term in search_terms:
-            search_url = f"{self.BASE_URL}/search"
-            search_response = self.session.get(search_url, params={"query": term}, headers=self.headers)
-            search_response.raise_for_status()
+            # Market data for the remaining ids in as few, concurrent calls as possible
+            missing_ids = list(missing_ids)
+            chunks = [missing_ids[i:i + self.MARKETS_MAX_IDS] for i in range(0, len(missing_ids), self.MARKETS_MAX_IDS)]
+            market_futures = [(f"markets:{i}", executor.submit(self._fetch_markets_by_ids, chunk)) for i, chunk in enumerate(chunks)]
             
-            # Get coin IDs from search results
-            coin_ids = [coin["id"] for coin in search_response.json().get("coins", [])]
-            
-            # Get detailed info for each coin
-            if coin_ids:
-                markets_url = f"{self.BASE_URL}/coins/markets"
-                params = {
-                    "vs_currency": "usd",
-                    "ids": ",".join(coin_ids[:25]),  # API limitation
-                    "order": "market_cap_desc",
-                    "per_page": 250,
-                    "page": 1
-                }
-                
-                markets_response = self.session.get(markets_url, params=params, headers=self.headers)
-                if markets_response.status_code == 200:
-                    ai_tokens.extend(markets_response.json())
-            
-            # Rate limiting
-            time.sleep(1)
+            for source, future in market_futures:
+                try:
+                    ai_tokens.extend(future.result())
+                except Exception as e:
+                    self.discovery_errors[source] = str(e)
         
         # Remove duplicates
         seen_ids = set()
@@ -111,101 +413,234 @@ class CoinGeckoAPI:
         
         return unique_tokens
     
-    def _get_token_details(self, tokens):
-        """Get detailed information for each token"""
-        detailed_tokens = []
+    def _fetch_category_tokens(self, category):
+        """Get market data for all coins in a category"""
+        category_url = f"{self.base_url}/coins/markets"
+        params = {
+            "vs_currency": "usd",
+            "category": category,
+            "order": "market_cap_desc",
+            "per_page": 250,
+            "page": 1
+        }
         
-        for token in tokens:
-            token_id = token["id"]
-            
-            # Add a categorization based on market cap
-            market_cap = token.get("market_cap", 0)
-            if market_cap is None:
-                market_cap = 0
-                
-            if market_cap >= 1_000_000_000:
-                market_cap_category = "Large Cap (>$1B)"
-            elif market_cap >= 100_000_000:
-                market_cap_category = "Mid Cap ($100M-$1B)"
-            elif market_cap >= 10_000_000:
-                market_cap_category = "Small Cap ($10M-$100M)"
-            elif market_cap >= 1_000_000:
-                market_cap_category = "Micro Cap ($1M-$10M)"
-            elif market_cap >= 500_000:
-                market_cap_category = "Nano Cap ($500K-$1M)"
-            else:
-                market_cap_category = "Ultra Nano Cap (<$500K)"
-                
-            token_data = {
-                "id": token_id,
-                "name": token.get("name", "Unknown"),
-                "symbol": token.get("symbol", "").upper(),
-                "market_cap": market_cap,
-                "market_cap_category": market_cap_category,
-                "price": token.get("current_price", 0),
-                "volume_24h": token.get("total_volume", 0),
-                "price_change_24h": token.get("price_change_percentage_24h", 0),
-                "price_change_7d": token.get("price_change_percentage_7d_in_currency", 0),
-                "image": token.get("image", ""),
-                "last_updated": token.get("last_updated", ""),
-            }
-            
-            detailed_tokens.append(token_data)
+        return self._get_json(category_url, params=params)
+    
+    def _search_coin_ids(self, term):
+        """Search for a term and return the ids of the matching coins"""
+        search_url = f"{self.base_url}/search"
+        search_results = self._get_json(search_url, params={"query": term})
         
-        return detailed_tokens
+        return [coin["id"] for coin in search_results.get("coins", [])]
     
-    @st.cache_data(ttl=300)
-    def get_token_historical_data(self, token_id, days=7):
+    def _fetch_markets_by_ids(self, coin_ids):
+        """Get market data for up to MARKETS_MAX_IDS coins in one call"""
+        markets_url = f"{self.base_url}/coins/markets"
+        params = {
+            "vs_currency": "usd",
+            "ids": ",".join(coin_ids),
+            "order": "market_cap_desc",
+            "per_page": self.MARKETS_MAX_IDS,
+            "page": 1
+        }
+        
+        return self._get_json(markets_url, params=params)
+    
+    @memoize_method(ttl=300, maxsize=512)
+    def get_token_historical_data(self, token_id, days=7, vs_currency="usd"):
         """Get historical market data for a specific token"""
+        # Sessions that miss the cache at the same moment share a single fetch
+        key = ("market_chart", token_id, days, vs_currency)
+        return _single_flight.do(key, self._fetch_historical_data, token_id, days, vs_currency)
+    
+    @memoize_method(ttl=300, maxsize=512)
+    def get_token_history(self, token_id, days=7, vs_currency="usd"):
+        """
+        Historical market data as a TokenHistory, which computes indicator columns
+        on first access and keeps them for as long as the history is cached
+        """
+        return TokenHistory(token_id, self.get_token_historical_data(token_id, days, vs_currency))
+    
+    def _fetch_historical_data(self, token_id, days, vs_currency="usd"):
+        """Fetch historical market data for a specific token"""
+        # Without an API key, provide high-quality demo history
+        if not self.api_key:
+            return generate_historical_data(days=days, seed=token_seed(token_id))
+        
+        end = int(time.time() * 1000)
+        start = end - days * 86_400_000
+        history_key = self._history_key(token_id, vs_currency)
+        
         try:
-            # Always provide high-quality historical data
-            return generate_historical_data(days=days)
-            
-            # In a production environment with API keys, we would use:
-            # url = f"{self.BASE_URL}/coins/{token_id}/market_chart"
-            # params = {
-            #     "vs_currency": "usd",
-            #     "days": days,
-            #     "interval": "daily" if days > 30 else "hourly"
-            # }
-            # response = self.session.get(url, params=params, headers=self.headers)
-            # response.raise_for_status()
-            # data = response.json()
-            # 
-            # prices_df = pd.DataFrame(data["prices"], columns=["timestamp", "price"])
-            # prices_df["date"] = pd.to_datetime(prices_df["timestamp"], unit="ms")
-            # 
-            # market_caps_df = pd.DataFrame(data["market_caps"], columns=["timestamp", "market_cap"])
-            # volumes_df = pd.DataFrame(data["total_volumes"], columns=["timestamp", "volume"])
-            # 
-            # result = prices_df.merge(market_caps_df[["timestamp", "market_cap"]], on="timestamp")
-            # result = result.merge(volumes_df[["timestamp", "volume"]], on="timestamp")
-            # 
-            # return result
+            # Request only the parts of the window the local store does not hold yet
+            for gap_start, gap_end in self._missing_history(history_key, start, end):
+                self._fetch_history_range(token_id, gap_start, gap_end, vs_currency)
+        except Exception:
+            # Serve whatever real history is stored; the gap is retried on the next call
+            pass
         
+        try:
+            # Short tail ranges come back at a finer granularity than the rest of the window
+            frame = self.history_store.read_frame(history_key, start, end, step=self._history_step(days))
         except Exception:
-            # Silent error handling for seamless user experience
-            return generate_historical_data(days=days)
+            frame = None
+        
+        if frame is None or frame.empty:
+            # Silent error handling for seamless user experience, only when nothing real is stored
+            return generate_historical_data(days=days, seed=token_seed(token_id))
+        return frame
+    
+    @staticmethod
+    def _history_step(days):
+        """Point spacing (ms) CoinGecko uses for a window of this many days"""
+        if days <= 1:
+            return 5 * 60_000
+        if days <= 90:
+            return 3_600_000
+        return 86_400_000
     
-    @st.cache_data(ttl=300)
+    @classmethod
+    def _range_step(cls, start, end):
+        """Point spacing (ms) market_chart/range returns for [start, end]"""
+        return cls._history_step((end - start) / 86_400_000)
+    
+    @staticmethod
+    def _history_key(token_id, vs_currency):
+        # USD history is stored under the bare token id
+        return token_id if vs_currency == "usd" else f"{token_id}.{vs_currency}"
+    
+    def _missing_history(self, history_key, start, end, tolerance=None):
+        """
+        Ranges of [start, end] not yet held locally at the resolution the window
+        needs, ignoring gaps shorter than tolerance (ms, HISTORY_MAX_STALENESS by
+        default). Daily points from a long window don't count as coverage for a
+        shorter, hourly one.
+        """
+        return self.history_store.missing_ranges(
+            history_key,
+            start,
+            end,
+            tolerance=self.HISTORY_MAX_STALENESS * 1000 if tolerance is None else tolerance,
+            resolution=self._range_step(start, end)
+        )
+    
+    def _fetch_history_range(self, token_id, start, end, vs_currency="usd"):
+        """Fetch one time range from market_chart/range and record it in the local store"""
+        url = f"{self.base_url}/coins/{token_id}/market_chart/range"
+        params = {
+            "vs_currency": vs_currency,
+            "from": start // 1000,
+            "to": end // 1000
+        }
+        # Ranges end at "now" and never repeat, so they bypass the response cache
+        response = self._get(url, params=params)
+        response.raise_for_status()
+        
+        history_key = self._history_key(token_id, vs_currency)
+        written = self._store_market_chart(history_key, response.json())
+        # Coverage is recorded only once the points are on disk, so it doubles as the checkpoint
+        self.history_store.add_coverage(history_key, start, end, resolution=self._range_step(start, end))
+        return written
+    
+    def backfill_history(self, token_ids=None, days=90, vs_currency="usd", tolerance=None):
+        """
+        Bring local history for many tokens (by default the whole AI universe) up to date.
+        
+        Only the missing ranges of each token are requested, concurrently and under the
+        shared rate limits. Every completed range is checkpointed in the store, so an
+        interrupted backfill picks up where it stopped when run again. Gaps shorter
+        than tolerance (ms, HISTORY_MAX_STALENESS by default) are left alone.
+        """
+        if token_ids is None:
+            token_ids = self.get_ai_related_tokens()["id"].tolist()
+        
+        end = int(time.time() * 1000)
+        start = end - days * 86_400_000
+        
+        jobs = [
+            (token_id, gap_start, gap_end)
+            for token_id in token_ids
+            for gap_start, gap_end in self._missing_history(self._history_key(token_id, vs_currency), start, end, tolerance)
+        ]
+        
+        result = {"tokens": len(token_ids), "ranges": len(jobs), "points_written": 0, "failed": {}}
+        
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            futures = [(token_id, executor.submit(self._fetch_history_range, token_id, gap_start, gap_end, vs_currency))
+                       for token_id, gap_start, gap_end in jobs]
+            
+            for token_id, future in futures:
+                try:
+                    result["points_written"] += future.result()
+                except Exception as e:
+                    # Leave the range uncovered; the next run retries it
+                    result["failed"][token_id] = str(e)
+        
+        return result
+    
+    def _store_market_chart(self, history_key, data):
+        """Append a market_chart payload to the local history store"""
+        prices = pd.DataFrame(data["prices"], columns=["timestamp", "price"])
+        market_caps = pd.DataFrame(data["market_caps"], columns=["timestamp", "market_cap"])
+        volumes = pd.DataFrame(data["total_volumes"], columns=["timestamp", "volume"])
+        
+        points = prices.merge(market_caps, on="timestamp").merge(volumes, on="timestamp")
+        return self.history_store.append(
+            history_key,
+            points["timestamp"].to_numpy(dtype="int64"),
+            points["price"].to_numpy(dtype="float64"),
+            points["market_cap"].to_numpy(dtype="float64"),
+            points["volume"].to_numpy(dtype="float64")
+        )
+    
+    def get_price_panel(self, token_ids, days=30, vs_currency="usd"):
+        """
+        Get histories for many tokens aligned on one time grid, as a PricePanel with
+        (timestamps x tokens) arrays for price, market cap and volume.
+        Tokens missing from the local store are backfilled in parallel first.
+        """
+        # Deduplicate while keeping order, and make the list hashable for the cache
+        return self._price_panel(tuple(dict.fromkeys(token_ids)), days, vs_currency)
+    
+    @memoize_method(ttl=300, maxsize=32)
+    def _price_panel(self, token_ids, days, vs_currency):
+        end = int(time.time() * 1000)
+        start = end - days * 86_400_000
+        # Same granularity market_chart/range returns: hourly up to 90 days, daily beyond
+        step = 3_600_000 if days <= 90 else 86_400_000
+        grid = time_grid(start, end, step)
+        
+        if not self.api_key:
+            return build_panel(generate_token_histories(token_ids, grid), token_ids, grid)
+        
+        # A panel can't resolve anything finer than its grid step, so a tail younger
+        # than one step is forward-filled rather than fetched for every token
+        self.backfill_history(list(token_ids), days=days, vs_currency=vs_currency, tolerance=step)
+        
+        # Read from before the window so the first grid points can be forward-filled
+        histories = {
+            token_id: self.history_store.read(self._history_key(token_id, vs_currency), start - step, end)
+            for token_id in token_ids
+        }
+        return build_panel(histories, token_ids, grid)
+    
+    @memoize_method(ttl=300, maxsize=256)
     def get_token_details(self, token_id):
         """Get detailed information about a specific token"""
         try:
-            # Always provide high-quality token details
-            return generate_token_details()
+            # Without an API key, provide high-quality demo token details
+            if not self.api_key:
+                return generate_token_details()
             
-            # In a production environment with API keys, we would use:
-            # url = f"{self.BASE_URL}/coins/{token_id}"
-            # params = {
-            #     "localization": "false",
-            #     "tickers": "false",
-            #     "market_data": "true",
-            #     "community_data": "true",
-            #     "developer_data": "false"
-            # }
-            # response = self.session.get(url, params=params, headers=self.headers)
-            # response.raise_for_status()
-            # return response.json()
+            url = f"{self.base_url}/coins/{token_id}"
+            params = {
+                "localization": "false",
+                "tickers": "false",
+                "market_data": "true",
+                "community_data": "true",
+                "developer_data": "false"
+            }
+            return self._get_json(url, params=params)
         
         except Exception:
             # Silent error handling for seamless user experience
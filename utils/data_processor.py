@@ -1,7 +1,62 @@
 import pandas as pd
 import numpy as np
 import streamlit as st
+import threading
 from datetime import datetime, timedelta
+from utils.aggregates import MarketAggregates
+from utils.filter_index import FilterIndex
+from utils.formatting import format_columns
+from utils.memo_cache import TTLCache
+from utils.snapshot import frame_tag, tag_frame
+from utils.topk import top_k_positions, TopKTracker
+
+# Derived results per (frame version, normalized settings), shared by every session
+_results = TTLCache(maxsize=512, ttl=3600)
+
+# Incremental top-k trackers per (metric, n, largest), following the universe snapshots
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+# Running headline metrics of the universe, following the snapshots
+_market_aggregates = MarketAggregates()
+
+# Settings that change what filter_tokens returns, with their defaults
+FILTER_DEFAULTS = {
+    "market_cap_min": 0,
+    "market_cap_max": float('inf'),
+    "category": "all",
+    "ai_category": "all",
+    "sort_by": "market_cap",
+    "sort_order": "desc"
+}
+
+
+def _normalize_filter_settings(filter_settings):
+    """Only the keys filtering depends on, with defaults filled in, as a hashable key"""
+    settings = {**FILTER_DEFAULTS, **{k: v for k, v in filter_settings.items() if k in FILTER_DEFAULTS}}
+    settings["market_cap_min"] = float(settings["market_cap_min"])
+    settings["market_cap_max"] = float(settings["market_cap_max"])
+    return tuple(settings[k] for k in FILTER_DEFAULTS)
+
+
+def _memoized(kind, df, params, compute, tag_result=False):
+    """
+    Memoize a result derived from a versioned frame. Frames without a version
+    tag (not from a universe snapshot) are computed every time. With tag_result
+    the result frame is tagged too, so results derived from it are cached as well.
+    """
+    tag = frame_tag(df)
+    if tag is None:
+        return compute()
+
+    key = (kind, tag, params)
+    result = _results.get(key)
+    if result is None:
+        result = compute()
+        if tag_result:
+            tag_frame(result, key)
+        _results.set(key, result)
+    return result
 
 class DataProcessor:
     """
@@ -16,37 +71,12 @@ class DataProcessor:
         if df.empty:
             return df
         
-        # Apply market cap filters
-        filtered_df = df.copy()
+        # Ranges, categories and sort order come from an index built once per
+        # universe frame, so each call only intersects bitmaps and takes rows
+        def compute():
+            return df.iloc[FilterIndex.for_frame(df).query(filter_settings)]
         
-        # Handle market cap filtering
-        market_cap_min = filter_settings.get("market_cap_min", 0)
-        market_cap_max = filter_settings.get("market_cap_max", float('inf'))
-        
-        filtered_df = filtered_df[
-            (filtered_df['market_cap'] >= market_cap_min) & 
-            (filtered_df['market_cap'] <= market_cap_max)
-        ]
-        
-        # Filter by market cap category if specified
-        category = filter_settings.get("category", "all")
-        if category != "all":
-            filtered_df = filtered_df[filtered_df['market_cap_category'] == category]
-        
-        # Filter by AI category if specified
-        ai_category = filter_settings.get("ai_category", "all")
-        if ai_category != "all" and 'ai_category' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['ai_category'] == ai_category]
-        
-        # Apply sorting
-        sort_by = filter_settings.get("sort_by", "market_cap")
-        sort_order = filter_settings.get("sort_order", "desc")
-        
-        if sort_by in filtered_df.columns:
-            is_ascending = sort_order == "asc"
-            filtered_df = filtered_df.sort_values(by=sort_by, ascending=is_ascending)
-        
-        return filtered_df
+        return _memoized("filter", df, _normalize_filter_settings(filter_settings), compute, tag_result=True)
     
     @staticmethod
     def get_top_gainers_losers(df, n=5):
@@ -60,45 +90,101 @@ class DataProcessor:
         if 'price_change_24h' not in df.columns:
             return pd.DataFrame(), pd.DataFrame()
         
-        # Sort by price change
-        df_sorted = df.sort_values(by='price_change_24h')
+        def compute():
+            # Partial selection of each end instead of sorting the whole frame
+            changes = df['price_change_24h'].to_numpy(dtype=np.float64)
+            gainers = df.iloc[top_k_positions(changes, n, largest=True)].copy()
+            losers = df.iloc[top_k_positions(changes, n, largest=False)].copy()
+            
+            return gainers, losers
         
-        # Get losers (bottom n)
-        losers = df_sorted.head(n).copy()
+        return _memoized("top_gainers_losers", df, n, compute)
+    
+    @staticmethod
+    def get_top_movers(snapshot, metric="price_change_24h", n=5):
+        """
+        Top and bottom n tokens of the whole universe by any numeric metric.
+        Trackers follow the snapshot chain and update from each refresh's
+        change set instead of rescanning the universe.
+        """
+        if snapshot is None or snapshot.data.empty or metric not in snapshot.data.columns:
+            return pd.DataFrame(), pd.DataFrame()
         
-        # Get gainers (top n)
-        gainers = df_sorted.tail(n).iloc[::-1].copy()
+        ends = []
+        for largest in (True, False):
+            with _trackers_lock:
+                tracker = _trackers.get((metric, n, largest))
+                if tracker is None:
+                    tracker = _trackers[(metric, n, largest)] = TopKTracker(metric, n, largest=largest)
+            # The ids come back with the update, so they always belong to this snapshot
+            ends.append(tracker.top(snapshot.data, tracker.update(snapshot)))
         
-        return gainers, losers
+        return tuple(ends)
     
     @staticmethod
     def calculate_market_stats(df):
         """
         Calculate overall market statistics
         """
-        stats = {}
-        
         if df.empty:
             return {
                 "total_tokens": 0,
                 "total_market_cap": 0,
+                "total_volume": 0,
                 "avg_24h_change": 0,
                 "token_counts_by_cap": {}
             }
         
-        # Total number of tokens
-        stats["total_tokens"] = len(df)
-        
-        # Total market cap
-        stats["total_market_cap"] = df['market_cap'].sum()
-        
-        # Average 24h price change
-        stats["avg_24h_change"] = df['price_change_24h'].mean()
+        def compute():
+            stats = {}
+            
+            # Total number of tokens
+            stats["total_tokens"] = len(df)
+            
+            # Total market cap
+            stats["total_market_cap"] = df['market_cap'].sum()
+            
+            # Total 24h trading volume
+            stats["total_volume"] = df['volume_24h'].sum() if 'volume_24h' in df.columns else 0
+            
+            # Average 24h price change
+            stats["avg_24h_change"] = df['price_change_24h'].mean()
+            
+            # Count tokens by market cap category
+            # (categorical columns also report categories with no tokens, so drop those)
+            counts = df['market_cap_category'].value_counts()
+            stats["token_counts_by_cap"] = counts[counts > 0].to_dict()
+            
+            return stats
         
-        # Count tokens by market cap category
-        stats["token_counts_by_cap"] = df['market_cap_category'].value_counts().to_dict()
+        return _memoized("market_stats", df, None, compute)
+    
+    @staticmethod
+    def format_columns(df, formats):
+        """
+        Display strings for numeric columns, formatted a whole column at a time
+        (see utils.formatting) and cached per snapshot. formats is a sequence
+        of (column, kind) pairs with kind "money", "price" or "change".
+        """
+        formats = tuple(formats)
+        return _memoized("formatted", df, formats, lambda: format_columns(df, formats))
+    
+    @staticmethod
+    def get_market_stats(snapshot):
+        """
+        calculate_market_stats for the whole universe, served from running
+        aggregates that each refresh updates in O(changed rows)
+        """
+        if snapshot is None or snapshot.data.empty:
+            return DataProcessor.calculate_market_stats(pd.DataFrame())
         
-        return stats
+        # The stats come back with the update, so they always belong to this snapshot
+        return _market_aggregates.update(snapshot)
+    
+    @staticmethod
+    def cache_stats():
+        """Hit/miss counters of the shared result cache"""
+        return _results.stats()
     
     @staticmethod
     def analyze_token_launch_trends(df):
@@ -110,12 +196,13 @@ class DataProcessor:
             return pd.DataFrame()
             
         # Convert last_updated to datetime
-        df['last_updated'] = pd.to_datetime(df['last_updated'])
+        # (without writing back: df may be the shared universe snapshot)
+        last_updated = pd.to_datetime(df['last_updated'])
         
         # Create a time-based analysis (this is approximate)
         # Group tokens by month of last update as a proxy for activity
-        df['month'] = df['last_updated'].dt.strftime('%Y-%m')
-        monthly_counts = df.groupby('month').size().reset_index(name='count')
+        month = last_updated.dt.strftime('%Y-%m').rename('month')
+        monthly_counts = df.groupby(month).size().reset_index(name='count')
         monthly_counts['month'] = pd.to_datetime(monthly_counts['month'])
         
         # Sort by month
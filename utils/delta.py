@@ -0,0 +1,87 @@
+import pandas as pd
+
+
+class ChangeSet:
+    """
+    Ids added, removed and updated between two snapshots of the token universe
+    """
+
+    def __init__(self, added=(), removed=(), updated=()):
+        self.added = list(added)
+        self.removed = list(removed)
+        self.updated = list(updated)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.updated)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.updated)
+
+    def __repr__(self):
+        return f"ChangeSet(added={len(self.added)}, removed={len(self.removed)}, updated={len(self.updated)})"
+
+
+def diff_frames(previous, current, key="id", version_column="last_updated"):
+    """Compare two universe frames by id and last_updated"""
+    previous_versions = pd.Series(previous[version_column].values, index=previous[key].values)
+    current_versions = pd.Series(current[version_column].values, index=current[key].values)
+
+    added = current_versions.index.difference(previous_versions.index, sort=False)
+    removed = previous_versions.index.difference(current_versions.index, sort=False)
+
+    common = current_versions.index.intersection(previous_versions.index, sort=False)
+    changed = current_versions.loc[common].values != previous_versions.loc[common].values
+    updated = common[changed]
+
+    return ChangeSet(added.tolist(), removed.tolist(), updated.tolist())
+
+
+def _align_categories(previous, current):
+    """Give categorical columns in both frames the union of their categories"""
+    for column in previous.columns:
+        if isinstance(previous[column].dtype, pd.CategoricalDtype) and isinstance(current[column].dtype, pd.CategoricalDtype):
+            categories = previous[column].cat.categories.union(current[column].cat.categories, sort=False)
+            if len(categories) != len(previous[column].cat.categories):
+                previous = previous.assign(**{column: previous[column].cat.set_categories(categories)})
+            if len(categories) != len(current[column].cat.categories):
+                current = current.assign(**{column: current[column].cat.set_categories(categories)})
+    return previous, current
+
+
+def apply_changes(previous, current, changes, key="id"):
+    """
+    Patch the previous frame with a change set: drop removed rows, overwrite
+    updated rows with their new values and append added rows. Unchanged rows
+    are carried over as they were; the previous frame itself is not modified.
+    """
+    previous, current = _align_categories(previous, current)
+    current_by_key = current.set_index(key, drop=False)
+
+    patched = previous.set_index(key, drop=False)
+    if changes.removed:
+        patched = patched.drop(index=changes.removed)
+    if changes.updated:
+        updates = current_by_key.loc[changes.updated]
+        # Column by column so every column keeps its dtype
+        for column in patched.columns:
+            patched.loc[changes.updated, column] = updates[column].values
+    if changes.added:
+        patched = pd.concat([patched, current_by_key.loc[changes.added, patched.columns]])
+
+    return patched.reset_index(drop=True)
+
+
+def incremental_update(previous, current, key="id", version_column="last_updated"):
+    """
+    Diff a freshly fetched frame against the previous one and patch only what changed.
+    Returns (data, changes), with changes None when the frame was replaced in full.
+    """
+    if previous is None or previous.empty or list(previous.columns) != list(current.columns):
+        # Nothing to patch against: a full rebuild, which consumers must not treat as a delta
+        return current, None
+
+    changes = diff_frames(previous, current, key=key, version_column=version_column)
+    if not changes:
+        return previous, changes
+
+    return apply_changes(previous, current, changes, key=key), changes
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+import zlib
+from utils import indicators
 
 def generate_dummy_tokens(n=50):
     """Generate realistic AI-related token data"""
@@ -240,9 +242,13 @@ def generate_dummy_tokens(n=50):
     df = pd.DataFrame(tokens)
     return df
 
-def generate_historical_data(days=30, intervals_per_day=24):
+def token_seed(token_id):
+    """Stable per-token seed, so each demo token keeps its own path across reruns"""
+    return zlib.crc32(str(token_id).encode("utf-8"))
+
+def generate_historical_data(days=30, intervals_per_day=24, seed=42):
     """Generate realistic price history data with patterns"""
-    np.random.seed(42)  # For reproducible results
+    rng = np.random.default_rng(seed)  # Reproducible per seed, without touching global state
     
     # Create a more interesting price series with trends, cycles and volatility clusters
     end_date = datetime.now()
@@ -250,49 +256,47 @@ def generate_historical_data(days=30, intervals_per_day=24):
     date_range = pd.date_range(start=start_date, end=end_date, periods=days*intervals_per_day)
     
     # Base parameters
-    initial_price = np.random.uniform(1.0, 20.0)
+    initial_price = rng.uniform(1.0, 20.0)
     
     # Time components
     t = np.linspace(0, days, len(date_range))
     
     # Long-term trend - slight uptrend
-    trend_direction = np.random.choice([-1, 1], p=[0.3, 0.7])  # 70% bullish
-    trend_strength = np.random.uniform(0.001, 0.005) * trend_direction
+    trend_direction = rng.choice([-1, 1], p=[0.3, 0.7])  # 70% bullish
+    trend_strength = rng.uniform(0.001, 0.005) * trend_direction
     trend = trend_strength * t
     
     # Market cycles - medium term oscillations
-    cycle_period = np.random.uniform(7, 14)  # 1-2 week cycles
-    cycle_amplitude = np.random.uniform(0.1, 0.3)
+    cycle_period = rng.uniform(7, 14)  # 1-2 week cycles
+    cycle_amplitude = rng.uniform(0.1, 0.3)
     market_cycle = cycle_amplitude * np.sin(2 * np.pi * t / cycle_period)
     
     # Short term oscillations - daily/intraday patterns
     short_cycle = 0.05 * np.sin(2 * np.pi * t) + 0.03 * np.cos(4 * np.pi * t)
     
     # Volatility clustering - periods of high/low volatility
-    volatility_base = np.random.uniform(0.01, 0.04)
-    volatility_cycle = np.random.uniform(10, 20)  # Length of volatility cycle
+    volatility_base = rng.uniform(0.01, 0.04)
+    volatility_cycle = rng.uniform(10, 20)  # Length of volatility cycle
     volatility = volatility_base * (1 + 0.5 * np.sin(2 * np.pi * t / volatility_cycle))
     
     # Market events - sudden movements
     num_events = int(days / 10) + 1  # Approximately one event every 10 days
-    event_locations = np.random.choice(range(len(date_range)), size=num_events, replace=False)
+    event_locations = rng.choice(len(date_range), size=num_events, replace=False)
     event_impact = np.zeros(len(date_range))
     
     for loc in event_locations:
         # Event magnitude - positive or negative shock
-        magnitude = np.random.uniform(-0.15, 0.15)
+        magnitude = rng.uniform(-0.15, 0.15)
         
         # Event duration - how long the effect lasts
-        duration = int(np.random.uniform(1, 3) * intervals_per_day)
+        duration = int(rng.uniform(1, 3) * intervals_per_day)
         
-        # Apply the event with decay
-        for i in range(min(duration, len(date_range) - loc)):
-            decay = 1 - (i / duration)
-            if loc + i < len(event_impact):
-                event_impact[loc + i] += magnitude * decay
+        # Apply the event with linear decay
+        span = min(duration, len(date_range) - loc)
+        event_impact[loc:loc + span] += magnitude * (1 - np.arange(span) / duration)
     
     # Generate price series with all components
-    returns = np.random.normal(0, volatility, size=len(date_range))
+    returns = rng.normal(0, volatility, size=len(date_range))
     noise_component = np.cumsum(returns)  # Random walk component
     normalized_noise = noise_component / np.max(np.abs(noise_component)) * 0.3  # Scale noise
     
@@ -304,73 +308,82 @@ def generate_historical_data(days=30, intervals_per_day=24):
     price_series = np.maximum(0.01, price_series)
     
     # Volume often correlates with price volatility and has intraday patterns
-    volume_base = initial_price * np.random.uniform(1e6, 1e8)  # Base volume scaled to price
+    volume_base = initial_price * rng.uniform(1e6, 1e8)  # Base volume scaled to price
     volume_daily_pattern = 0.5 + 0.5 * np.sin(np.pi * (t * intervals_per_day % intervals_per_day) / intervals_per_day)
     volume_volatility = 1 + 5 * np.abs(np.diff(price_series, prepend=price_series[0]))  # Higher volume on big moves
     
     volume_series = volume_base * volume_daily_pattern * volume_volatility
     
     # Market cap calculation with gradually increasing supply
-    initial_supply = np.random.uniform(1e7, 1e9)
-    supply_growth = np.random.uniform(0, 0.0001)  # Daily supply growth rate
+    initial_supply = rng.uniform(1e7, 1e9)
+    supply_growth = rng.uniform(0, 0.0001)  # Daily supply growth rate
     supply_series = initial_supply * (1 + supply_growth) ** t
     
     market_cap_series = price_series * supply_series
     
     # Create the DataFrame with additional columns for analysis
     data = {
-        "timestamp": [int(dt.timestamp() * 1000) for dt in date_range],
+        "timestamp": int(start_date.timestamp() * 1000) + (date_range - date_range[0]) // pd.Timedelta(milliseconds=1),
         "date": date_range,
         "price": price_series,
         "market_cap": market_cap_series,
         "volume": volume_series,
         "supply": supply_series,
         "volatility": volatility,
-        # Technical indicators
-        "sma_7": pd.Series(price_series).rolling(7).mean().values,
-        "sma_30": pd.Series(price_series).rolling(30).mean().values,
-        "price_change_pct": pd.Series(price_series).pct_change().values * 100,
     }
     
     df = pd.DataFrame(data)
     
-    # Calculate additional technical indicators
-    df["rsi_14"] = calculate_rsi(df["price"], 14)
-    df["bollinger_upper"], df["bollinger_lower"] = calculate_bollinger_bands(df["price"], 20)
+    # Technical indicators are computed on demand by utils.history.TokenHistory
     
     # Add a column identifying notable market events for annotations
     df["is_notable_event"] = False
-    for loc in event_locations:
-        if loc < len(df):
-            df.loc[loc, "is_notable_event"] = True
-            df.loc[loc, "event_description"] = np.random.choice([
-                "Partnership Announcement", "Token Burn", "Exchange Listing", 
-                "Protocol Upgrade", "Security Incident", "Major Investment",
-                "Regulatory News", "Market Trend Change", "New Product Launch"
-            ])
+    df.loc[event_locations, "is_notable_event"] = True
+    df.loc[event_locations, "event_description"] = rng.choice([
+        "Partnership Announcement", "Token Burn", "Exchange Listing", 
+        "Protocol Upgrade", "Security Incident", "Major Investment",
+        "Regulatory News", "Market Trend Change", "New Product Launch"
+    ], size=len(event_locations))
     
     return df
 
 def calculate_rsi(prices, window=14):
-    """Calculate Relative Strength Index"""
-    delta = prices.diff()
-    gain = delta.mask(delta < 0, 0)
-    loss = -delta.mask(delta > 0, 0)
-    
-    avg_gain = gain.rolling(window=window).mean()
-    avg_loss = loss.rolling(window=window).mean()
-    
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    """Calculate Relative Strength Index (Wilder smoothing)"""
+    return pd.Series(indicators.rsi(prices.values, window), index=prices.index)
 
 def calculate_bollinger_bands(prices, window=20, num_std=2):
     """Calculate Bollinger Bands"""
-    sma = prices.rolling(window=window).mean()
-    std = prices.rolling(window=window).std()
-    upper_band = sma + (std * num_std)
-    lower_band = sma - (std * num_std)
-    return upper_band, lower_band
+    _, upper_band, lower_band = indicators.bollinger_bands(prices.values, window, num_std)
+    return pd.Series(upper_band, index=prices.index), pd.Series(lower_band, index=prices.index)
+
+def generate_token_histories(token_ids, timestamps, market_caps=None):
+    """
+    Generate demo price histories for several tokens on the given timestamps (ms).
+    Every token follows a shared market factor plus its own noise, seeded from its
+    id, so paths differ between tokens but stay the same across reruns.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    n = len(timestamps)
+    
+    # Shared market factor
+    market_rng = np.random.default_rng(42)
+    market_returns = market_rng.normal(0, 0.004, n)
+    
+    histories = {}
+    for i, token_id in enumerate(token_ids):
+        rng = np.random.default_rng(token_seed(token_id))
+        beta = rng.uniform(0.5, 1.5)
+        volatility = rng.uniform(0.003, 0.012)
+        returns = beta * market_returns + rng.normal(0, volatility, n)
+        
+        price = rng.lognormal(mean=0, sigma=1.5) * np.exp(np.cumsum(returns))
+        supply = (market_caps[i] / price[-1]) if market_caps is not None else rng.uniform(1e7, 1e9)
+        market_cap = price * supply
+        volume = market_cap * rng.uniform(0.02, 0.15) * (1 + 20 * np.abs(returns))
+        
+        histories[token_id] = {"timestamp": timestamps, "price": price, "market_cap": market_cap, "volume": volume}
+    
+    return histories
 
 def generate_token_details():
     """Generate comprehensive token information with realistic detail"""
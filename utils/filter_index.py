@@ -0,0 +1,122 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Columns filtered by exact value; each gets one boolean bitmap per distinct value
+BITMAP_COLUMNS = ("market_cap_category", "ai_category")
+
+# One index per universe frame, dropped when the frame itself is garbage collected
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class FilterIndex:
+    """
+    Lookup structures over one universe frame for fast filtering and sorting.
+
+    Numeric columns get their sort order and sorted values (built on first use),
+    so a range filter is two searchsorted calls; the columns in BITMAP_COLUMNS
+    get a bitmap per value. A query intersects bitmaps and returns row positions
+    already in the requested sort order, without copying the frame. The frame
+    must not be modified after the index is built (universe snapshots never are).
+    The index only holds a weak reference to its frame, so it is dropped with it.
+    """
+
+    def __init__(self, df):
+        self._frame = weakref.ref(df)
+        self._sorted = {}
+        self._lock = threading.Lock()
+        self._bitmaps = {}
+        for column in BITMAP_COLUMNS:
+            if column in df.columns:
+                codes, values = pd.factorize(df[column])
+                self._bitmaps[column] = {value: codes == code for code, value in enumerate(values)}
+
+    @classmethod
+    def for_frame(cls, df):
+        """The shared index of a frame, built on first request"""
+        key = id(df)
+        with _indexes_lock:
+            entry = _indexes.get(key)
+            if entry is not None and entry[0]() is df:
+                return entry[1]
+
+            index = cls(df)
+            _indexes[key] = (weakref.ref(df), index)
+            weakref.finalize(df, _indexes.pop, key, None)
+            return index
+
+    @property
+    def df(self):
+        df = self._frame()
+        if df is None:
+            raise ReferenceError("The frame of this FilterIndex has been garbage collected")
+        return df
+
+    def __len__(self):
+        return len(self.df)
+
+    def sorted(self, column):
+        """(positions, values) of a numeric column in ascending order, NaNs last"""
+        with self._lock:
+            if column not in self._sorted:
+                values = self.df[column].to_numpy(dtype=np.float64)
+                order = np.argsort(values, kind="stable")
+                self._sorted[column] = (order, values[order])
+            return self._sorted[column]
+
+    def range_mask(self, column, low=-np.inf, high=np.inf):
+        """Bitmap of rows with low <= column <= high; NaNs never match"""
+        order, values = self.sorted(column)
+        lo = np.searchsorted(values, low, side="left")
+        hi = np.searchsorted(values, high, side="right")
+        mask = np.zeros(len(self.df), dtype=bool)
+        mask[order[lo:hi]] = True
+        return mask
+
+    def bitmap(self, column, value):
+        """Bitmap of rows where column == value"""
+        bitmaps = self._bitmaps.get(column)
+        if bitmaps is None:
+            return (self.df[column] == value).to_numpy()
+        mask = bitmaps.get(value)
+        return mask if mask is not None else np.zeros(len(self.df), dtype=bool)
+
+    def order(self, column, ascending=True):
+        """Row positions sorted by a column, NaNs last either way (as sort_values does)"""
+        order, values = self.sorted(column)
+        if ascending:
+            return order
+        n_valid = len(values) - np.isnan(values).sum()
+        return np.concatenate([order[:n_valid][::-1], order[n_valid:]])
+
+    def query(self, filter_settings):
+        """Row positions matching the filter settings, in their sort order"""
+        mask = self.range_mask(
+            "market_cap",
+            filter_settings.get("market_cap_min", 0),
+            filter_settings.get("market_cap_max", float('inf'))
+        )
+
+        category = filter_settings.get("category", "all")
+        if category != "all":
+            mask &= self.bitmap("market_cap_category", category)
+
+        ai_category = filter_settings.get("ai_category", "all")
+        if ai_category != "all" and "ai_category" in self.df.columns:
+            mask &= self.bitmap("ai_category", ai_category)
+
+        sort_by = filter_settings.get("sort_by", "market_cap")
+        ascending = filter_settings.get("sort_order", "desc") == "asc"
+        if sort_by not in self.df.columns:
+            return np.flatnonzero(mask)
+        if pd.api.types.is_numeric_dtype(self.df[sort_by]):
+            order = self.order(sort_by, ascending=ascending)
+            return order[mask[order]]
+
+        # Text columns are rare sort keys: sort just the matching rows
+        positions = np.flatnonzero(mask)
+        matching = self.df[sort_by].iloc[positions].reset_index(drop=True)
+        return positions[matching.sort_values(ascending=ascending).index.to_numpy()]
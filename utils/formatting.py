@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+# Unit thresholds of DataProcessor.format_number, largest first
+_UNITS = ((1_000_000_000, "B"), (1_000_000, "M"), (1_000, "K"))
+
+# Whole parts from here on could overflow int64
+_MAX_EXACT = 2.0 ** 62
+
+# Variable-width strings; the string ufuncs are several times faster on these than on '<U'
+_STRING = np.dtypes.StringDType()
+
+# Unit lookup tables; index 0 is "no unit"
+_DIVISORS = np.array([1] + [threshold for threshold, _ in _UNITS], dtype=np.float64)
+_SUFFIXES = np.array([""] + [suffix for _, suffix in _UNITS], dtype=_STRING)
+
+
+def _integer_strings(integers, grouping=False):
+    """Decimal strings of non-negative int64s, optionally with thousands separators"""
+    text = integers.astype(_STRING)
+    if not grouping:
+        return text
+
+    # Only rows of 1000 and up need separators; rebuild those group by group
+    large = np.flatnonzero(integers >= 1000)
+    grouped = np.strings.zfill((integers[large] % 1000).astype(_STRING), 3)
+    pending = np.arange(len(large))
+    remaining = integers[large] // 1000
+    while len(pending):
+        low = (remaining % 1000).astype(_STRING)
+        remaining = remaining // 1000
+        group = np.where(remaining > 0, np.strings.zfill(low, 3), low)
+        grouped[pending] = np.strings.add(np.strings.add(group, ","), grouped[pending])
+        more = remaining > 0
+        pending, remaining = pending[more], remaining[more]
+    text[large] = grouped
+    return text
+
+
+def _fixed_strings(magnitudes, precision, grouping=False):
+    """'1234.56'-style strings of non-negative finite magnitudes"""
+    # Splitting off the whole part first keeps the fraction exact for large values
+    scale = 10 ** precision
+    whole = np.floor(magnitudes)
+    scaled = (magnitudes - whole) * scale
+    fraction = np.round(scaled)
+    carry = fraction >= scale
+    whole[carry] += 1
+    fraction[carry] -= scale
+
+    # np.round takes exact halves to even while Python formatting rounds the
+    # exact binary value; those and whole parts too large for int64 are
+    # formatted one by one
+    exceptions = (whole >= _MAX_EXACT) | (scaled - np.floor(scaled) == 0.5)
+    text = _integer_strings(np.where(exceptions, 0, whole).astype(np.int64), grouping)
+    if precision > 0:
+        digits = np.strings.zfill(fraction.astype(np.int64).astype(_STRING), precision)
+        text = np.strings.add(np.strings.add(text, "."), digits)
+
+    if exceptions.any():
+        spec = f"{',' if grouping else ''}.{precision}f"
+        text[exceptions] = [format(value, spec) for value in magnitudes[exceptions]]
+    return text
+
+
+def _signed(values, prefix="", suffix="", precision=2, grouping=False, plus=False, divisors=None):
+    """
+    prefix + sign + fixed-point magnitude + suffix for a whole column in a few
+    array passes; suffix may be an array (one unit per row). Missing values
+    become "N/A".
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    magnitudes = np.abs(np.where(finite, values, 0.0))
+    if divisors is not None:
+        magnitudes = magnitudes / divisors
+
+    digits = _fixed_strings(magnitudes, precision, grouping)
+    # Sign and "N/A" touch only the rows that need them
+    negative = np.flatnonzero(np.signbit(values))
+    text = np.strings.add("+", digits) if plus else digits.copy()
+    text[negative] = np.strings.add("-", digits[negative])
+    if prefix:
+        text = np.strings.add(prefix, text)
+    text = np.strings.add(text, suffix)
+    text[~finite] = "N/A"
+    return text.astype(object)
+
+
+def format_money(values, precision=2):
+    """
+    Vectorized DataProcessor.format_number: "$1.23B", "$45.60M", "$7.89K", "$12.00".
+    The unit is picked per row with np.select on the magnitude.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    magnitudes = np.abs(values)
+    unit = np.select([magnitudes >= threshold for threshold, _ in _UNITS], np.arange(1, len(_UNITS) + 1), 0)
+    divisors = _DIVISORS[unit]
+    return _signed(values, prefix="$", suffix=_SUFFIXES[unit], precision=precision, divisors=divisors)
+
+
+def format_price(values, precision=6, grouping=True):
+    """Prices, with thousands separators by default: "$1,234.567890" """
+    return _signed(values, prefix="$", precision=precision, grouping=grouping)
+
+
+def format_change(values, precision=2):
+    """Signed percentage changes: "+1.23%", "-0.45%" """
+    return _signed(values, suffix="%", precision=precision, plus=True)
+
+
+FORMATTERS = {
+    "money": format_money,
+    "price": format_price,
+    "change": format_change,
+}
+
+
+def format_columns(df, formats):
+    """
+    Display strings for several numeric columns at once, as a frame aligned
+    with df. formats is a sequence of (column, kind) pairs, kind being a key
+    of FORMATTERS.
+    """
+    return pd.DataFrame(
+        {column: FORMATTERS[kind](df[column].to_numpy(dtype=np.float64)) for column, kind in formats},
+        index=df.index
+    )
@@ -0,0 +1,84 @@
+import re
+import threading
+
+import pandas as pd
+
+from utils import indicators
+
+_WINDOWED_COLUMN = re.compile(r"^(sma|ema|rsi)_(\d+)$")
+_BOLLINGER_COLUMNS = {"bollinger_middle": 0, "bollinger_upper": 1, "bollinger_lower": 2}
+
+
+class TokenHistory:
+    """
+    Price history of one token with indicator columns computed on first access.
+
+    The frame holds what the API returns (timestamp, date, price, market_cap,
+    volume). Indicators are derived from the price column only when asked for
+    and memoized per (indicator, window), so a view pays only for what it shows.
+    Columns like 'sma_7', 'rsi_14' or 'bollinger_upper' can be read with
+    history[column] just like on the frame itself.
+    """
+
+    def __init__(self, token_id, frame):
+        self.token_id = token_id
+        self.frame = frame
+        self._indicators = {}
+        self._lock = threading.Lock()
+
+    @property
+    def empty(self):
+        return self.frame.empty
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __contains__(self, column):
+        return column in self.frame.columns
+
+    def __getitem__(self, column):
+        if column in self.frame.columns:
+            return self.frame[column]
+
+        match = _WINDOWED_COLUMN.match(column)
+        if match:
+            return getattr(self, match.group(1))(int(match.group(2)))
+        if column in _BOLLINGER_COLUMNS:
+            return self.bollinger_bands()[_BOLLINGER_COLUMNS[column]]
+        if column == "price_change_pct":
+            return self.price_change_pct()
+        raise KeyError(column)
+
+    @property
+    def computed(self):
+        """Indicators computed so far, as (name, parameters...) keys"""
+        return list(self._indicators)
+
+    def _memo(self, key, compute):
+        with self._lock:
+            if key not in self._indicators:
+                self._indicators[key] = compute(self.frame["price"].to_numpy(dtype="float64"))
+            return self._indicators[key]
+
+    def _series(self, values, name):
+        return pd.Series(values, index=self.frame.index, name=name)
+
+    def sma(self, window):
+        return self._memo(("sma", window), lambda p: self._series(indicators.sma(p, window), f"sma_{window}"))
+
+    def ema(self, span):
+        return self._memo(("ema", span), lambda p: self._series(indicators.ema(p, span), f"ema_{span}"))
+
+    def rsi(self, window=14):
+        return self._memo(("rsi", window), lambda p: self._series(indicators.rsi(p, window), f"rsi_{window}"))
+
+    def bollinger_bands(self, window=20, num_std=2):
+        """(middle, upper, lower) bands"""
+        def compute(prices):
+            bands = indicators.bollinger_bands(prices, window, num_std)
+            return tuple(self._series(band, name) for band, name in zip(bands, _BOLLINGER_COLUMNS))
+
+        return self._memo(("bollinger", window, num_std), compute)
+
+    def price_change_pct(self):
+        return self._memo(("price_change_pct",), lambda p: self.frame["price"].pct_change() * 100)
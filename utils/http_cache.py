@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class CachedResponse:
+    """
+    A cached JSON payload together with its HTTP validators
+    """
+
+    def __init__(self, body, etag=None, last_modified=None, fetched_at=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def conditional_headers(self):
+        """Headers that turn the next request for this entry into a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of raw API responses, one JSON file per (url, params).
+
+    Entries survive restarts, so a freshly started process can serve the last
+    known payload and revalidate it with a conditional request.
+    """
+
+    def __init__(self, directory=None, max_age=300, stale_ttl=6 * 3600):
+        self.directory = directory or os.getenv(
+            "COINGECKO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "m100d_http_cache")
+        )
+        # Entries younger than max_age are fresh; up to max_age + stale_ttl they
+        # can still be served while a revalidation runs in the background
+        self.max_age = max_age
+        self.stale_ttl = stale_ttl
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def cache_key(url, params=None):
+        """Stable key for a request, independent of parameter order"""
+        raw = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url, params=None):
+        """Return the cached response for a request, or None"""
+        try:
+            with open(self._path(self.cache_key(url, params)), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return CachedResponse(
+            data.get("body"),
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+            fetched_at=data.get("fetched_at", 0)
+        )
+
+    def put(self, url, params, body, etag=None, last_modified=None):
+        """Store a response body and its validators"""
+        entry = CachedResponse(body, etag=etag, last_modified=last_modified)
+        self._write(self.cache_key(url, params), url, params, entry)
+        return entry
+
+    def touch(self, url, params, entry):
+        """Mark an entry as fresh again after a 304 Not Modified"""
+        entry.fetched_at = time.time()
+        self._write(self.cache_key(url, params), url, params, entry)
+        return entry
+
+    def _write(self, key, url, params, entry):
+        data = {
+            "url": url,
+            "params": params or {},
+            "fetched_at": entry.fetched_at,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "body": entry.body
+        }
+
+        # Write to a temp file and rename so readers never see a partial entry
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            pass
+
+    def is_fresh(self, entry):
+        return entry.age < self.max_age
+
+    def is_servable(self, entry):
+        return entry.age < self.max_age + self.stale_ttl
+
+    def clear(self):
+        """Remove all cached responses"""
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,155 @@
+import numpy as np
+
+# Technical indicators over (time x tokens) arrays. Every kernel works along
+# axis 0 for all columns at once and also accepts a single 1-D series. NaNs
+# (a token with no price yet) are skipped: windows that touch one are NaN, and
+# recursive averages carry their last value across the gap.
+
+
+def _as_2d(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values.reshape(len(values), -1), values.ndim == 1
+
+
+def _restore(result, flat):
+    return result[:, 0] if flat else result
+
+
+def _rolling_sums(values, window, shift=None):
+    """Rolling sum, sum of squares and count of finite values over the last `window` rows"""
+    valid = np.isfinite(values)
+    x = np.where(valid, values - (0.0 if shift is None else shift), 0.0)
+
+    def rolling(a):
+        c = np.cumsum(a, axis=0)
+        c[window:] = c[window:] - c[:-window]
+        return c
+
+    return rolling(x), rolling(x * x), rolling(valid.astype(np.int64))
+
+
+def sma(values, window):
+    """Simple moving average"""
+    values, flat = _as_2d(values)
+    total, _, count = _rolling_sums(values, window)
+    with np.errstate(invalid="ignore"):
+        result = np.where(count == window, total / window, np.nan)
+    return _restore(result, flat)
+
+
+def rolling_std(values, window, ddof=1):
+    """Rolling standard deviation"""
+    values, flat = _as_2d(values)
+    # Sums are taken around each column's first price to keep the variance well conditioned
+    first = values[np.argmax(np.isfinite(values), axis=0), np.arange(values.shape[1])]
+    total, total_sq, count = _rolling_sums(values, window, shift=np.nan_to_num(first))
+    with np.errstate(invalid="ignore"):
+        variance = np.maximum(total_sq - total * total / window, 0.0) / (window - ddof)
+    return _restore(np.where(count == window, np.sqrt(variance), np.nan), flat)
+
+
+def _recursive_average(values, alpha, warmup):
+    """
+    state += alpha * (x - state), seeded with the mean of each column's first
+    `warmup` finite values. One loop over time, vectorized across tokens.
+    """
+    valid = np.isfinite(values)
+    seen = np.cumsum(valid, axis=0)
+    seeded = seen >= warmup
+
+    # Seed every column at once: the row where its warmup-th value arrives and the mean so far
+    start = np.where(seeded.any(axis=0), np.argmax(seeded, axis=0), len(values))
+    seed = np.where(valid & (seen <= warmup), values, 0.0).sum(axis=0) / warmup
+    starting = np.arange(len(values))[:, np.newaxis] == start[np.newaxis, :]
+    updating = valid & seeded & ~starting
+
+    result = np.empty(values.shape)
+    state = np.full(values.shape[1], np.nan)
+    for t, x in enumerate(values):
+        np.copyto(state, seed, where=starting[t])
+        np.add(state, alpha * (x - state), out=state, where=updating[t])
+        result[t] = state
+
+    return result
+
+
+def ema(values, span):
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with the first value"""
+    values, flat = _as_2d(values)
+    return _restore(_recursive_average(values, 2.0 / (span + 1), 1), flat)
+
+
+def wilder(values, window):
+    """Wilder's smoothing (alpha = 1 / window), seeded with the simple average of the first window"""
+    values, flat = _as_2d(values)
+    return _restore(_recursive_average(values, 1.0 / window, window), flat)
+
+
+def rsi(values, window=14):
+    """Relative Strength Index with Wilder smoothing of gains and losses"""
+    values, flat = _as_2d(values)
+    delta = np.diff(values, axis=0, prepend=np.nan)
+    avg_gain = _recursive_average(np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0)), 1.0 / window, window)
+    avg_loss = _recursive_average(np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0)), 1.0 / window, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # No losses in the window: 100, or 50 when the price didn't move at all
+    flat_window = (avg_loss == 0) & (avg_gain == 0)
+    result = np.where(flat_window, 50.0, result)
+    return _restore(result, flat)
+
+
+def bollinger_bands(values, window=20, num_std=2):
+    """Middle, upper and lower Bollinger bands"""
+    middle = sma(values, window)
+    width = num_std * rolling_std(values, window)
+    return middle, middle + width, middle - width
+
+
+def macd(values, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram"""
+    values, flat = _as_2d(values)
+    line = _recursive_average(values, 2.0 / (fast + 1), 1) - _recursive_average(values, 2.0 / (slow + 1), 1)
+    signal_line = _recursive_average(line, 2.0 / (signal + 1), 1)
+    return tuple(_restore(a, flat) for a in (line, signal_line, line - signal_line))
+
+
+def atr(high, low, close, window=14):
+    """
+    Average True Range with Wilder smoothing. Price histories from CoinGecko
+    have no highs and lows; passing the close for all three gives the
+    close-to-close variant.
+    """
+    high, flat = _as_2d(high)
+    low, _ = _as_2d(low)
+    close, _ = _as_2d(close)
+    previous = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+
+    with np.errstate(invalid="ignore"):
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    # The first row has no previous close; its range is just high - low
+    true_range[0] = high[0] - low[0]
+    return _restore(_recursive_average(true_range, 1.0 / window, window), flat)
+
+
+def compute_indicators(prices):
+    """
+    The standard indicator set for a whole (time x tokens) price panel in one call,
+    keyed by the column names generate_historical_data uses.
+    """
+    middle, upper, lower = bollinger_bands(prices, 20)
+    macd_line, macd_signal, macd_hist = macd(prices)
+    return {
+        "sma_7": sma(prices, 7),
+        "sma_30": sma(prices, 30),
+        "ema_12": ema(prices, 12),
+        "rsi_14": rsi(prices, 14),
+        "bollinger_middle": middle,
+        "bollinger_upper": upper,
+        "bollinger_lower": lower,
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist": macd_hist,
+        "atr_14": atr(prices, prices, prices, 14),
+    }
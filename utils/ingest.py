@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+# Lower bounds of each market cap category, ascending; everything below the
+# first bound is Ultra Nano Cap
+MARKET_CAP_BINS = np.array([500_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000], dtype=np.float64)
+MARKET_CAP_LABELS = [
+    "Ultra Nano Cap (<$500K)",
+    "Nano Cap ($500K-$1M)",
+    "Micro Cap ($1M-$10M)",
+    "Small Cap ($10M-$100M)",
+    "Mid Cap ($100M-$1B)",
+    "Large Cap (>$1B)"
+]
+
+
+def categorize_market_caps(market_caps):
+    """Assign market cap categories to a whole array at once"""
+    codes = np.searchsorted(MARKET_CAP_BINS, np.asarray(market_caps, dtype=np.float64), side="right")
+    return pd.Categorical.from_codes(codes, categories=MARKET_CAP_LABELS)
+
+
+def _float_column(tokens, key):
+    # None becomes NaN when numpy converts the list straight to float64
+    return np.array([token.get(key) for token in tokens], dtype=np.float64)
+
+
+def _string_column(tokens, key, default=""):
+    return [token.get(key) or default for token in tokens]
+
+
+def markets_to_frame(tokens):
+    """
+    Build the token universe frame from raw /coins/markets payloads, column by column.
+
+    Numeric columns go straight into float64 arrays, symbol and category are
+    categoricals, and categories come from one vectorized binning pass instead
+    of a per-token if/elif chain.
+    """
+    market_cap = np.nan_to_num(_float_column(tokens, "market_cap"), nan=0.0)
+    symbols = pd.Categorical([symbol.upper() for symbol in _string_column(tokens, "symbol")])
+
+    return pd.DataFrame({
+        "id": [token["id"] for token in tokens],
+        "name": _string_column(tokens, "name", "Unknown"),
+        "symbol": symbols,
+        "market_cap": market_cap,
+        "market_cap_category": categorize_market_caps(market_cap),
+        "price": _float_column(tokens, "current_price"),
+        "volume_24h": _float_column(tokens, "total_volume"),
+        "price_change_24h": _float_column(tokens, "price_change_percentage_24h"),
+        "price_change_7d": _float_column(tokens, "price_change_percentage_7d_in_currency"),
+        "image": _string_column(tokens, "image"),
+        "last_updated": _string_column(tokens, "last_updated"),
+    })
@@ -0,0 +1,131 @@
+import os
+import time
+
+import numpy as np
+
+from utils.price_panel import PANEL_FIELDS, PricePanel
+
+HOUR_MS = 3_600_000
+DAY_MS = 86_400_000
+
+
+def _token_parameters(rng, n_tokens, n_sectors, step):
+    """Per-token model parameters; volatilities are given per hour and scaled to the step"""
+    step_scale = np.sqrt(step / HOUR_MS)
+    return {
+        "beta": rng.uniform(0.5, 1.5, n_tokens),
+        "sector": rng.integers(0, n_sectors, n_tokens),
+        "loading": rng.uniform(0.3, 1.0, n_tokens),
+        "volatility": rng.uniform(0.003, 0.012, n_tokens) * step_scale,
+        "drift": rng.normal(0, 0.0002, n_tokens) * step / HOUR_MS,
+        "initial_price": rng.lognormal(mean=0, sigma=1.5, size=n_tokens),
+        "supply": rng.uniform(1e7, 1e9, n_tokens),
+        "supply_growth": rng.uniform(0, 0.0001, n_tokens),  # per day
+        "turnover": rng.uniform(0.02, 0.15, n_tokens),
+        "event_probability": rng.uniform(0.0005, 0.002, n_tokens) * step / HOUR_MS,
+        "event_size": rng.uniform(0.03, 0.12, n_tokens),
+        # Event impact fades with a half-life of one to three days
+        "event_decay": 0.5 ** (step / (rng.uniform(1, 3, n_tokens) * DAY_MS)),
+    }
+
+
+def _allocate(shape, out_dir, name):
+    if out_dir is None:
+        return np.empty(shape)
+    return np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+", dtype=np.float64, shape=shape)
+
+
+def simulate_market(n_tokens, n_steps, step=HOUR_MS, start=None, seed=None, token_ids=None,
+                    n_sectors=4, out_dir=None, chunk_size=512):
+    """
+    Synthetic price, market cap and volume paths for n_tokens over n_steps, as a PricePanel.
+
+    Each token's log return is its own drift plus beta times a shared market
+    factor (with volatility clustering), a loading on one of n_sectors sector
+    factors and idiosyncratic noise; sparse market events add shocks that
+    fade out. Volume follows market cap, turnover, the size of each move and
+    an intraday cycle.
+
+    All randomness comes from a Generator tree built from `seed`, one stream
+    per model component, so a seed gives the same market whatever the chunk
+    size. Rows are generated chunk_size at a time; with out_dir the fields are
+    written to memory-mapped .npy files there, which keeps memory flat for
+    universes much larger than RAM (10k tokens x 1 year hourly is ~2 GB).
+    """
+    streams = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(6)]
+    params_rng, market_rng, sector_rng, noise_rng, event_rng, event_size_rng = streams
+    params = _token_parameters(params_rng, n_tokens, n_sectors, step)
+
+    if start is None:
+        start = (int(time.time() * 1000) // step - n_steps + 1) * step
+    timestamps = start + np.arange(n_steps, dtype=np.int64) * step
+    if token_ids is None:
+        token_ids = [f"sim-{i}" for i in range(n_tokens)]
+
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        np.save(os.path.join(out_dir, "timestamp.npy"), timestamps)
+    fields = {name: _allocate((n_steps, n_tokens), out_dir, name) for name in PANEL_FIELDS}
+
+    market_volatility = 0.004 * np.sqrt(step / HOUR_MS)
+    level = np.zeros(n_tokens)   # cumulative log return so far
+    impact = np.zeros(n_tokens)  # log price offset from events still fading out
+    previous = None              # last log price of the previous chunk
+
+    for lo in range(0, n_steps, chunk_size):
+        hi = min(lo + chunk_size, n_steps)
+        rows = hi - lo
+        days = (timestamps[lo:hi] - start) / DAY_MS
+
+        # Calm and turbulent stretches for the whole market, on a ~15 day cycle
+        clustering = 1 + 0.5 * np.sin(2 * np.pi * days / 15)
+        market = market_rng.normal(0, market_volatility, rows) * clustering
+        sectors = sector_rng.normal(0, market_volatility * 0.6, (rows, n_sectors))
+
+        returns = noise_rng.standard_normal((rows, n_tokens))
+        returns *= params["volatility"] * clustering[:, np.newaxis]
+        returns += params["drift"]
+        returns += market[:, np.newaxis] * params["beta"]
+        returns += sectors[:, params["sector"]] * params["loading"]
+        np.cumsum(returns, axis=0, out=returns)
+        returns += level
+        level = returns[-1].copy()
+        log_price = returns
+
+        # Events: jumps drawn in row-major order so chunking doesn't change them
+        happened = event_rng.random((rows, n_tokens)) < params["event_probability"]
+        jumps = np.zeros((rows, n_tokens))
+        jumps[happened] = event_size_rng.standard_normal(happened.sum()) * np.broadcast_to(params["event_size"], happened.shape)[happened]
+        for t in range(rows):
+            impact *= params["event_decay"]
+            impact += jumps[t]
+            log_price[t] += impact
+
+        price = fields["price"][lo:hi]
+        np.exp(log_price, out=price)
+        price *= params["initial_price"]
+
+        supply = params["supply"] * np.exp(params["supply_growth"] * days[:, np.newaxis])
+        fields["market_cap"][lo:hi] = price * supply
+
+        # Bigger moves and the busy half of the day trade more
+        moves = np.abs(np.diff(log_price, axis=0, prepend=log_price[:1] if previous is None else previous[np.newaxis]))
+        previous = log_price[-1].copy()
+        hours = (timestamps[lo:hi] // HOUR_MS) % 24
+        intraday = 0.5 + 0.5 * np.sin(np.pi * hours / 24)
+        fields["volume"][lo:hi] = fields["market_cap"][lo:hi] * params["turnover"] * (1 + 20 * moves) * intraday[:, np.newaxis]
+
+    for array in fields.values():
+        if isinstance(array, np.memmap):
+            array.flush()
+
+    return PricePanel(timestamps, token_ids, **fields)
+
+
+def load_market(out_dir, token_ids=None):
+    """Open a market written by simulate_market(out_dir=...) as a memory-mapped PricePanel"""
+    timestamps = np.load(os.path.join(out_dir, "timestamp.npy"))
+    fields = {name: np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode="r") for name in PANEL_FIELDS}
+    if token_ids is None:
+        token_ids = [f"sim-{i}" for i in range(fields["price"].shape[1])]
+    return PricePanel(timestamps, token_ids, **fields)
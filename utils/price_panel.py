@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+PANEL_FIELDS = ("price", "market_cap", "volume")
+
+
+class PricePanel:
+    """
+    Histories of many tokens on one common time grid.
+
+    Each field is a float64 array of shape (timestamps x tokens); a token with
+    no data yet at a grid point holds NaN there.
+    """
+
+    def __init__(self, timestamps, token_ids, price, market_cap, volume):
+        self.timestamps = timestamps
+        self.token_ids = list(token_ids)
+        self.price = price
+        self.market_cap = market_cap
+        self.volume = volume
+
+    @property
+    def shape(self):
+        return self.price.shape
+
+    @property
+    def dates(self):
+        return pd.to_datetime(self.timestamps, unit="ms")
+
+    def frame(self, field="price"):
+        """One field as a DataFrame indexed by date with a column per token"""
+        return pd.DataFrame(getattr(self, field), index=self.dates, columns=self.token_ids)
+
+    def select(self, token_ids):
+        """Panel restricted to a subset of tokens, in the given order"""
+        positions = [self.token_ids.index(token_id) for token_id in token_ids]
+        return PricePanel(
+            self.timestamps,
+            token_ids,
+            self.price[:, positions],
+            self.market_cap[:, positions],
+            self.volume[:, positions]
+        )
+
+
+def time_grid(start, end, step):
+    """Regular grid of timestamps (ms) from start to end, aligned to multiples of step"""
+    first = -(-start // step) * step
+    return np.arange(first, end + 1, step, dtype=np.int64)
+
+
+def build_panel(histories, token_ids, grid):
+    """
+    Resample per-token histories onto a grid with forward fill, for all tokens in one pass.
+
+    histories maps token id -> anything indexable by 'timestamp' and the PANEL_FIELDS
+    (a TimeSeriesStore.read array or a dict of arrays), sorted by timestamp.
+    """
+    n_tokens = len(token_ids)
+    lengths = np.array([
+        len(histories[token_id]["timestamp"]) if token_id in histories else 0 for token_id in token_ids
+    ], dtype=np.int64)
+    panel = {field: np.full((len(grid), n_tokens), np.nan) for field in PANEL_FIELDS}
+
+    if not len(grid) or not lengths.sum():
+        return PricePanel(grid, token_ids, **panel)
+
+    present = [histories[token_id] for token_id, length in zip(token_ids, lengths) if length]
+    timestamps = np.concatenate([np.asarray(h["timestamp"], dtype=np.int64) for h in present])
+    owners = np.repeat(np.arange(n_tokens), lengths)
+
+    # Give every token its own band on one number line, so a single searchsorted
+    # finds the last observation at or before each grid point for all tokens at once
+    origin = min(timestamps.min(), grid[0])
+    span = max(timestamps.max(), grid[-1]) - origin + 1
+    keys = owners * span + (timestamps - origin)
+    query = np.arange(n_tokens)[np.newaxis, :] * span + (grid - origin)[:, np.newaxis]
+
+    positions = np.searchsorted(keys, query, side="right") - 1
+    valid = (positions >= 0) & (owners[np.maximum(positions, 0)] == np.arange(n_tokens)[np.newaxis, :])
+    positions = np.where(valid, positions, 0)
+
+    for field in PANEL_FIELDS:
+        values = np.concatenate([np.asarray(h[field], dtype=np.float64) for h in present])
+        panel[field] = np.where(valid, values[positions], np.nan)
+
+    return PricePanel(grid, token_ids, **panel)
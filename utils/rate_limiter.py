@@ -0,0 +1,181 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to pace outgoing API requests
+    """
+
+    def __init__(self, rate, capacity=None):
+        # rate is in tokens per second, capacity is the largest allowed burst
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, calls_per_minute, burst=None):
+        """Create a bucket from a calls-per-minute quota"""
+        return cls(calls_per_minute / 60.0, capacity=burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if they are available right now, without waiting"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until tokens are available; returns False if timeout expires first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            # Sleep outside the lock so other threads can refill/check in the meantime
+            time.sleep(wait)
+
+    @property
+    def available(self):
+        """Number of tokens currently in the bucket"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class SharedRateLimiter:
+    """
+    Fixed-window request budget shared by every process on the host.
+
+    The counter lives in a small SQLite database; ``BEGIN IMMEDIATE`` takes the
+    database write lock, so concurrent Streamlit workers see one consistent count.
+    """
+
+    def __init__(self, path, limit, window_seconds=60, name="default"):
+        self.path = path
+        self.limit = int(limit)
+        self.window_seconds = float(window_seconds)
+        self.name = name
+        self._local = threading.local()
+        self._disabled = False
+
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS rate_windows ("
+                    "name TEXT PRIMARY KEY, window_start REAL NOT NULL, used INTEGER NOT NULL)"
+                )
+        except sqlite3.Error:
+            # Fail open: a broken counter should not take the app down
+            self._disabled = True
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def _current_window(self):
+        # Wall-clock time so that all processes agree on window boundaries
+        now = time.time()
+        return now, now - (now % self.window_seconds)
+
+    def _used(self, conn, window_start):
+        row = conn.execute(
+            "SELECT window_start, used FROM rate_windows WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is None or row[0] < window_start:
+            return 0
+        return row[1]
+
+    def try_acquire(self):
+        """Take one call from the current window if any are left"""
+        if self._disabled:
+            return True
+
+        try:
+            with self._transaction() as conn:
+                _, window_start = self._current_window()
+                used = self._used(conn, window_start)
+                if used >= self.limit:
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_windows (name, window_start, used) VALUES (?, ?, ?)",
+                    (self.name, window_start, used + 1)
+                )
+                return True
+        except sqlite3.Error:
+            return True
+
+    def acquire(self, timeout=None):
+        """Block until the shared budget allows one more call"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self.try_acquire():
+            now, window_start = self._current_window()
+            wait = window_start + self.window_seconds - now
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            time.sleep(max(wait, 0.01))
+
+        return True
+
+    def quota(self):
+        """Usage of the current window: limit, used, remaining and seconds until reset"""
+        now, window_start = self._current_window()
+        used = 0
+
+        if not self._disabled:
+            try:
+                used = self._used(self._connection(), window_start)
+            except sqlite3.Error:
+                pass
+
+        return {
+            "limit": self.limit,
+            "used": used,
+            "remaining": max(0, self.limit - used),
+            "resets_in": window_start + self.window_seconds - now
+        }
@@ -0,0 +1,112 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the endpoint's circuit is open"""
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds, or None"""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, capped per attempt
+    """
+
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=10.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, status_code):
+        return status_code in self.RETRYABLE_STATUS
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Seconds to wait before the next attempt, or None to give up.
+        A server-provided Retry-After wins over the computed backoff, unless it
+        asks for longer than max_delay, in which case waiting is not worth it.
+        """
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and calls are
+    refused for reset_timeout seconds; then a single trial call is let through
+    (half-open) and its outcome closes or reopens the circuit.
+
+    A server's Retry-After is recorded with hold_off(): until it expires every
+    call to the endpoint is refused, whatever the state of the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._hold_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go through right now"""
+        with self._lock:
+            if time.monotonic() < self._hold_until:
+                return False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Let exactly one trial call through
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def hold_off(self, seconds):
+        """Refuse calls for the next `seconds`, as the server asked, without counting a failure"""
+        with self._lock:
+            self._hold_until = max(self._hold_until, time.monotonic() + seconds)
+
+    @property
+    def hold_off_remaining(self):
+        """Seconds until calls are allowed again after a hold_off(), 0 if none is pending"""
+        with self._lock:
+            return max(0.0, self._hold_until - time.monotonic())
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
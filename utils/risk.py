@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from utils.analytics import cached, log_returns
+
+# Minimum number of returns a token needs before its metrics are reported
+MIN_OBSERVATIONS = 24
+
+RISK_LABELS = ["Low Risk", "Medium Risk", "High Risk"]
+
+
+def max_drawdown(prices):
+    """Deepest peak-to-trough fall of each column of a (time x tokens) price array, as a fraction"""
+    # fmax ignores NaN, so gaps before a token's first price don't poison the running peak
+    peaks = np.fmax.accumulate(prices, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdowns = prices / peaks - 1.0
+    return np.fmin.reduce(drawdowns, axis=0)
+
+
+def _column_quantile(values, counts, q):
+    """Linearly interpolated q-quantile of the finite values in each column"""
+    # NaNs sort to the end, so the finite values of column j are its first counts[j] rows
+    ordered = np.sort(values, axis=0)
+    position = np.maximum(counts - 1, 0) * q
+    lo = np.floor(position).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(counts - 1, 0))
+    lower = np.take_along_axis(ordered, lo[np.newaxis, :], axis=0)[0]
+    upper = np.take_along_axis(ordered, hi[np.newaxis, :], axis=0)[0]
+    return lower + (upper - lower) * (position - lo)
+
+
+def risk_metrics(prices, periods_per_day, token_ids=None, confidence=0.95):
+    """
+    Risk metrics for every column of a (time x tokens) price array in one pass.
+
+    Volatilities, downside deviation and VaR are in percent; volatility and VaR
+    are scaled from the sampling period to a day with the square-root-of-time
+    rule. Sharpe and Sortino ratios are annualized with a zero risk-free rate.
+    Tokens with fewer than MIN_OBSERVATIONS returns get NaN throughout.
+    """
+    returns = log_returns(prices)
+    valid = np.isfinite(returns)
+    counts = valid.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.where(valid, returns, 0.0)
+        mean = x.sum(axis=0) / counts
+        variance = ((x - mean) ** 2 * valid).sum(axis=0) / (counts - 1)
+        downside = (np.minimum(x, 0.0) ** 2).sum(axis=0) / counts
+
+        periods_per_year = periods_per_day * 365
+        annual_return = mean * periods_per_year
+        annual_volatility = np.sqrt(variance * periods_per_year)
+        annual_downside = np.sqrt(downside * periods_per_year)
+
+        # Historical VaR: the loss the worst (1 - confidence) of periods exceed
+        var = -_column_quantile(returns, counts, 1 - confidence)
+
+        daily_volatility = np.sqrt(variance * periods_per_day)
+        metrics = pd.DataFrame({
+            "daily_volatility": daily_volatility * 100,
+            "weekly_volatility": daily_volatility * np.sqrt(7) * 100,
+            "annual_volatility": annual_volatility * 100,
+            "downside_deviation": annual_downside * 100,
+            "sharpe_ratio": annual_return / annual_volatility,
+            "sortino_ratio": annual_return / annual_downside,
+            "max_drawdown": max_drawdown(prices) * 100,
+            "var_95": var * np.sqrt(periods_per_day) * 100,
+        }, index=token_ids)
+
+    metrics[counts < MIN_OBSERVATIONS] = np.nan
+    metrics = metrics.replace([np.inf, -np.inf], np.nan)
+
+    # Risk score: where a token ranks across the universe on volatility and drawdown
+    ranks = pd.concat([metrics["daily_volatility"].rank(pct=True), (-metrics["max_drawdown"]).rank(pct=True)], axis=1)
+    metrics["risk_score"] = (ranks.mean(axis=1) * 100).clip(1, 99)
+    metrics["risk_category"] = pd.cut(metrics["risk_score"], bins=[0, 33, 66, 100], labels=RISK_LABELS, include_lowest=True)
+    return metrics
+
+
+def token_risk(api, snapshot, days=30):
+    """
+    Risk metrics for the whole token universe over the last `days`, from real
+    (or, without an API key, demo) history; cached per snapshot version.
+    """
+    def compute():
+        panel = api.get_price_panel(snapshot.data["id"].tolist(), days=days)
+        periods_per_day = 86_400_000 // int(np.median(np.diff(panel.timestamps))) if len(panel.timestamps) > 1 else 1
+        return risk_metrics(panel.price, periods_per_day, token_ids=panel.token_ids)
+
+    return cached("risk", snapshot.version, (days,), compute)
@@ -0,0 +1,60 @@
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs the
+    function, every caller that arrives while it is in flight waits on the same
+    future and gets the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._executed = Counter()
+        self._absorbed = Counter()
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn for key unless an identical call is already in flight"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+                self._executed[self._endpoint(key)] += 1
+            else:
+                self._absorbed[self._endpoint(key)] += 1
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    @staticmethod
+    def _endpoint(key):
+        # Keys are (endpoint, params...) tuples; counters are kept per endpoint
+        return key[0] if isinstance(key, tuple) and key else key
+
+    def stats(self):
+        """Counters of executed and absorbed (deduplicated) calls, per endpoint and in total"""
+        with self._lock:
+            return {
+                "executed": sum(self._executed.values()),
+                "absorbed": sum(self._absorbed.values()),
+                "in_flight": len(self._in_flight),
+                "executed_by_endpoint": dict(self._executed),
+                "absorbed_by_endpoint": dict(self._absorbed)
+            }
@@ -0,0 +1,132 @@
+import threading
+import time
+import weakref
+
+# Version tags of published frames (and results derived from them), looked up
+# by identity so pandas operations never carry a tag over to a different frame
+_frame_tags = {}
+_frame_tags_lock = threading.Lock()
+
+
+def tag_frame(df, tag):
+    """Attach a hashable version tag to a frame for as long as the frame lives"""
+    key = id(df)
+    with _frame_tags_lock:
+        _frame_tags[key] = (weakref.ref(df), tag)
+    weakref.finalize(df, _untag, key)
+
+
+def _untag(key):
+    with _frame_tags_lock:
+        _frame_tags.pop(key, None)
+
+
+def frame_tag(df):
+    """The tag given to this exact frame, or None"""
+    with _frame_tags_lock:
+        entry = _frame_tags.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return None
+
+
+class Snapshot:
+    """
+    Immutable view of the token universe at one point in time
+    """
+
+    def __init__(self, data, version, built_at=None, changes=None):
+        self.data = data
+        self.version = version
+        self.built_at = built_at if built_at is not None else time.time()
+        # What changed relative to the previous snapshot (None for a full rebuild)
+        self.changes = changes
+
+    @property
+    def age(self):
+        return time.time() - self.built_at
+
+
+class SnapshotRefresher:
+    """
+    Background worker that rebuilds a snapshot before it goes stale.
+
+    Readers call latest() and always get the most recent complete snapshot;
+    the worker swaps new snapshots in with a single reference assignment, so
+    readers never see a half-built one and never wait on the network (apart
+    from the very first build in a fresh process).
+    """
+
+    def __init__(self, build_fn, ttl=300, refresh_ahead=60, retry_interval=30, merge_fn=None):
+        self.build_fn = build_fn
+        # Optional merge_fn(previous_data, new_data) -> (data, changes) for incremental
+        # refreshes; when changes is empty the current snapshot is kept as is, and
+        # changes=None means the data was rebuilt in full
+        self.merge_fn = merge_fn
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.retry_interval = retry_interval
+        self.last_error = None
+
+        self._snapshot = None
+        self._version = 0
+        self._ready = threading.Event()
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+                self._thread.start()
+        return self
+
+    def latest(self, timeout=None):
+        """Return the most recent snapshot, waiting only if none has been built yet"""
+        self.start()
+        self._ready.wait(timeout)
+        return self._snapshot
+
+    @property
+    def current(self):
+        """The most recent snapshot, or None before the first build; never waits"""
+        return self._snapshot
+
+    def refresh_now(self):
+        """Ask the worker to rebuild immediately instead of waiting for the next cycle"""
+        self._wakeup.set()
+
+    def _build(self):
+        data = self.build_fn()
+        changes = None
+
+        previous = self._snapshot
+        if self.merge_fn is not None and previous is not None:
+            data, changes = self.merge_fn(previous.data, data)
+            if changes is not None and not changes:
+                # Nothing changed: keep the current snapshot and its version
+                previous.built_at = time.time()
+                return
+
+        self._version += 1
+        # Results derived from the data are memoized against this version
+        tag_frame(data, ("snapshot", id(self), self._version))
+        # Publishing is a single reference swap; readers keep whatever they already hold
+        self._snapshot = Snapshot(data, self._version, changes=changes)
+        self._ready.set()
+
+    def _run(self):
+        while True:
+            try:
+                self._build()
+                self.last_error = None
+                wait = max(1, self.ttl - self.refresh_ahead)
+            except Exception as e:
+                # Keep serving the previous snapshot and retry sooner
+                self.last_error = e
+                wait = self.retry_interval
+
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
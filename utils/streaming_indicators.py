@@ -0,0 +1,251 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Incremental counterparts of the utils.indicators kernels. Each object keeps
+# the running state for a vector of tokens and folds in one new price per
+# token in O(1), giving the same values the batch kernels would give for the
+# whole history. A NaN price means "no tick for this token"; its state is left
+# as is. State round-trips through to_dict/from_dict (plain JSON types).
+
+
+class _StreamingIndicator:
+    kind = None
+    _int_fields = ()
+
+    def to_dict(self):
+        state = {"type": self.kind}
+        for name, value in vars(self).items():
+            state[name] = value.tolist() if isinstance(value, np.ndarray) else value
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        indicator = cls.__new__(cls)
+        for name, value in state.items():
+            if name == "type":
+                continue
+            if isinstance(value, list):
+                value = np.array(value, dtype=np.int64 if name in cls._int_fields else np.float64)
+            setattr(indicator, name, value)
+        return indicator
+
+
+class _RollingWindow(_StreamingIndicator):
+    """Ring buffer with running sum and sum of squares over the last `window` prices"""
+
+    _int_fields = ("position", "count")
+
+    def __init__(self, window, n_tokens=1):
+        self.window = window
+        self.updates = 0
+        # Values are stored relative to each token's first price to keep the variance well conditioned
+        self.shift = np.full(n_tokens, np.nan)
+        self.buffer = np.zeros((window, n_tokens))
+        self.position = np.zeros(n_tokens, dtype=np.int64)
+        self.count = np.zeros(n_tokens, dtype=np.int64)
+        self.total = np.zeros(n_tokens)
+        self.total_sq = np.zeros(n_tokens)
+
+    def _push(self, prices):
+        prices = np.asarray(prices, dtype=np.float64).reshape(-1)
+        tokens = np.flatnonzero(np.isfinite(prices))
+        self.shift[tokens] = np.where(np.isnan(self.shift[tokens]), prices[tokens], self.shift[tokens])
+
+        x = prices[tokens] - self.shift[tokens]
+        slots = self.position[tokens]
+        # Slots not yet filled hold 0, so sliding out the old value is the same in both cases
+        old = self.buffer[slots, tokens]
+        self.total[tokens] += x - old
+        self.total_sq[tokens] += x * x - old * old
+        self.buffer[slots, tokens] = x
+        self.position[tokens] = (slots + 1) % self.window
+        self.count[tokens] = np.minimum(self.count[tokens] + 1, self.window)
+
+        # Rebuild the running sums from the buffer once per window to stop float drift
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.total = self.buffer.sum(axis=0)
+            self.total_sq = (self.buffer * self.buffer).sum(axis=0)
+
+    def _mean(self):
+        return np.where(self.count == self.window, self.shift + self.total / self.window, np.nan)
+
+
+class StreamingSMA(_RollingWindow):
+    """Simple moving average"""
+
+    kind = "sma"
+
+    def update(self, prices):
+        self._push(prices)
+        return self.value
+
+    @property
+    def value(self):
+        return self._mean()
+
+
+class StreamingBollinger(_RollingWindow):
+    """Middle, upper and lower Bollinger bands"""
+
+    kind = "bollinger"
+
+    def __init__(self, window=20, num_std=2, n_tokens=1):
+        super().__init__(window, n_tokens)
+        self.num_std = num_std
+
+    def update(self, prices):
+        self._push(prices)
+        return self.value
+
+    @property
+    def value(self):
+        middle = self._mean()
+        variance = np.maximum(self.total_sq - self.total ** 2 / self.window, 0.0) / (self.window - 1)
+        width = self.num_std * np.sqrt(variance)
+        return middle, middle + width, middle - width
+
+
+class StreamingEMA(_StreamingIndicator):
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with the first price"""
+
+    kind = "ema"
+
+    def __init__(self, span, n_tokens=1):
+        self.alpha = 2.0 / (span + 1)
+        self.state = np.full(n_tokens, np.nan)
+
+    def update(self, prices):
+        prices = np.asarray(prices, dtype=np.float64).reshape(-1)
+        valid = np.isfinite(prices)
+        self.state = np.where(
+            valid,
+            np.where(np.isnan(self.state), prices, self.state + self.alpha * (prices - self.state)),
+            self.state
+        )
+        return self.value
+
+    @property
+    def value(self):
+        return self.state.copy()
+
+
+class StreamingRSI(_StreamingIndicator):
+    """Relative Strength Index with Wilder smoothing, seeded with the simple average of the first window"""
+
+    kind = "rsi"
+    _int_fields = ("seen",)
+
+    def __init__(self, window=14, n_tokens=1):
+        self.window = window
+        self.previous = np.full(n_tokens, np.nan)
+        self.seen = np.zeros(n_tokens, dtype=np.int64)
+        self.avg_gain = np.zeros(n_tokens)
+        self.avg_loss = np.zeros(n_tokens)
+
+    def update(self, prices):
+        prices = np.asarray(prices, dtype=np.float64).reshape(-1)
+        delta = prices - self.previous
+        moved = np.isfinite(delta)
+        self.previous = np.where(np.isfinite(prices), prices, self.previous)
+
+        gain = np.where(moved, np.maximum(delta, 0.0), 0.0)
+        loss = np.where(moved, np.maximum(-delta, 0.0), 0.0)
+
+        # Until the window is full the averages hold running sums; they become
+        # means on the window-th change and are Wilder-smoothed from then on
+        seeding = moved & (self.seen < self.window)
+        smoothing = moved & ~seeding
+        self.avg_gain = np.where(seeding, self.avg_gain + gain, self.avg_gain)
+        self.avg_loss = np.where(seeding, self.avg_loss + loss, self.avg_loss)
+        self.seen = self.seen + seeding
+        completed = seeding & (self.seen == self.window)
+        self.avg_gain = np.where(completed, self.avg_gain / self.window, self.avg_gain)
+        self.avg_loss = np.where(completed, self.avg_loss / self.window, self.avg_loss)
+
+        self.avg_gain = np.where(smoothing, self.avg_gain + (gain - self.avg_gain) / self.window, self.avg_gain)
+        self.avg_loss = np.where(smoothing, self.avg_loss + (loss - self.avg_loss) / self.window, self.avg_loss)
+        return self.value
+
+    @property
+    def value(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+        rsi = np.where((self.avg_gain == 0) & (self.avg_loss == 0), 50.0, rsi)
+        return np.where(self.seen >= self.window, rsi, np.nan)
+
+
+_KINDS = {cls.kind: cls for cls in (StreamingSMA, StreamingBollinger, StreamingEMA, StreamingRSI)}
+
+
+class StreamingIndicators:
+    """
+    The indicator columns generate_historical_data produces (plus EMA-12), kept
+    up to date tick by tick for a fixed list of tokens.
+    """
+
+    def __init__(self, token_ids):
+        self.token_ids = list(token_ids)
+        n = len(self.token_ids)
+        self.indicators = {
+            "sma_7": StreamingSMA(7, n),
+            "sma_30": StreamingSMA(30, n),
+            "ema_12": StreamingEMA(12, n),
+            "rsi_14": StreamingRSI(14, n),
+            "bollinger_20": StreamingBollinger(20, 2, n),
+        }
+
+    def update(self, prices):
+        """Fold in one price per token (aligned with token_ids) and return the current values"""
+        for indicator in self.indicators.values():
+            indicator.update(prices)
+        return self.values()
+
+    def values(self):
+        """Current indicator values as {column: array aligned with token_ids}"""
+        _, upper, lower = self.indicators["bollinger_20"].value
+        return {
+            "sma_7": self.indicators["sma_7"].value,
+            "sma_30": self.indicators["sma_30"].value,
+            "ema_12": self.indicators["ema_12"].value,
+            "rsi_14": self.indicators["rsi_14"].value,
+            "bollinger_upper": upper,
+            "bollinger_lower": lower,
+        }
+
+    def to_dict(self):
+        return {
+            "token_ids": self.token_ids,
+            "indicators": {name: indicator.to_dict() for name, indicator in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        streaming = cls.__new__(cls)
+        streaming.token_ids = list(state["token_ids"])
+        streaming.indicators = {
+            name: _KINDS[indicator["type"]].from_dict(indicator)
+            for name, indicator in state["indicators"].items()
+        }
+        return streaming
+
+    def save(self, path):
+        """Write the state to a JSON file atomically"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Restore state written by save(), or None if there is none"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
@@ -0,0 +1,265 @@
+import json
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+# One record per history point; segments are raw arrays of these records
+POINT_DTYPE = np.dtype([
+    ("timestamp", "<i8"),  # milliseconds since epoch, as returned by CoinGecko
+    ("price", "<f8"),
+    ("market_cap", "<f8"),
+    ("volume", "<f8"),
+])
+
+# Point spacing assumed for coverage recorded without one: daily, the coarsest
+# market_chart/range returns, so such ranges never stand in for finer data
+LEGACY_RESOLUTION = 86_400_000
+
+
+def merge_intervals(intervals, tolerance=0):
+    """Merge (start, end) intervals that overlap or are within tolerance of each other"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + tolerance:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(interval) for interval in merged]
+
+
+class TimeSeriesStore:
+    """
+    Append-only, memory-mapped price history, one segment file per token and month.
+
+    Each segment is a flat binary file of POINT_DTYPE records sorted by timestamp,
+    so appending is a plain file append and reads are np.memmap slices.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv(
+            "COINGECKO_HISTORY_DIR", os.path.join(tempfile.gettempdir(), "m100d_history")
+        )
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _token_dir(self, token_id):
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_.-]", "_", token_id))
+
+    def _coverage_path(self, token_id):
+        return os.path.join(self._token_dir(token_id), "coverage.json")
+
+    def _segment_path(self, token_id, month):
+        return os.path.join(self._token_dir(token_id), f"{month}.bin")
+
+    def segments(self, token_id):
+        """Months ('YYYY-MM') with stored data for a token, oldest first"""
+        try:
+            names = os.listdir(self._token_dir(token_id))
+        except OSError:
+            return []
+        return sorted(name[:-4] for name in names if name.endswith(".bin"))
+
+    def _open_segment(self, token_id, month):
+        path = self._segment_path(token_id, month)
+        try:
+            if os.path.getsize(path) < POINT_DTYPE.itemsize:
+                return np.empty(0, dtype=POINT_DTYPE)
+        except OSError:
+            return np.empty(0, dtype=POINT_DTYPE)
+        return np.memmap(path, dtype=POINT_DTYPE, mode="r")
+
+    @staticmethod
+    def _months(timestamps):
+        return np.asarray(timestamps, dtype="datetime64[ms]").astype("datetime64[M]").astype(str)
+
+    def last_timestamp(self, token_id):
+        """Timestamp (ms) of the newest stored point, or None"""
+        for month in reversed(self.segments(token_id)):
+            segment = self._open_segment(token_id, month)
+            if len(segment):
+                return int(segment["timestamp"][-1])
+        return None
+
+    def first_timestamp(self, token_id):
+        """Timestamp (ms) of the oldest stored point, or None"""
+        for month in self.segments(token_id):
+            segment = self._open_segment(token_id, month)
+            if len(segment):
+                return int(segment["timestamp"][0])
+        return None
+
+    def append(self, token_id, timestamps, prices, market_caps, volumes):
+        """
+        Store points that are not already present and return how many were written.
+
+        New points past the end of a month segment are appended to its file; the
+        rare points that land before a segment's tail (an older window being
+        filled in) cause only that month's segment to be rewritten.
+        """
+        points = np.empty(len(timestamps), dtype=POINT_DTYPE)
+        points["timestamp"] = timestamps
+        points["price"] = prices
+        points["market_cap"] = market_caps
+        points["volume"] = volumes
+        points = np.sort(points, order="timestamp")
+
+        # Drop duplicate timestamps within the batch itself
+        points = points[np.r_[True, np.diff(points["timestamp"]) > 0]] if len(points) else points
+        if not len(points):
+            return 0
+
+        written = 0
+        with self._lock:
+            os.makedirs(self._token_dir(token_id), exist_ok=True)
+            months = self._months(points["timestamp"])
+            boundaries = np.flatnonzero(months[1:] != months[:-1]) + 1
+            for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(points)]):
+                written += self._write_month(token_id, months[start], points[start:end])
+
+        return written
+
+    def _write_month(self, token_id, month, points):
+        segment = self._open_segment(token_id, month)
+        path = self._segment_path(token_id, month)
+
+        if len(segment):
+            # Skip points that are already stored
+            stored = segment["timestamp"]
+            positions = np.minimum(np.searchsorted(stored, points["timestamp"]), len(stored) - 1)
+            points = points[stored[positions] != points["timestamp"]]
+            if not len(points):
+                return 0
+
+        if not len(segment) or points["timestamp"][0] > segment["timestamp"][-1]:
+            # Fast path: everything is newer than the segment tail
+            with open(path, "ab") as f:
+                f.write(points.tobytes())
+            return len(points)
+
+        # Merge into the segment and swap the file in atomically; readers that
+        # still map the old file keep a consistent view
+        merged = np.sort(np.concatenate([np.asarray(segment), points]), order="timestamp")
+        del segment
+        fd, tmp_path = tempfile.mkstemp(dir=self._token_dir(token_id), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(merged.tobytes())
+        os.replace(tmp_path, path)
+        return len(points)
+
+    def _read_coverage(self, token_id):
+        """{resolution (ms): [(start, end), ...]} as stored in the coverage file"""
+        try:
+            with open(self._coverage_path(token_id), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if isinstance(stored, list):
+            # Files from before resolutions were recorded: assume the coarsest one
+            stored = {str(LEGACY_RESOLUTION): stored}
+        return {int(resolution): [tuple(interval) for interval in intervals] for resolution, intervals in stored.items()}
+
+    def coverage(self, token_id, resolution=None):
+        """
+        Time ranges (ms) already fetched for a token, merged and sorted. With a
+        resolution (ms) only ranges fetched at that point spacing or finer count.
+        """
+        intervals = [
+            interval
+            for fetched_resolution, fetched in self._read_coverage(token_id).items()
+            if resolution is None or fetched_resolution <= resolution
+            for interval in fetched
+        ]
+        return merge_intervals(intervals)
+
+    def add_coverage(self, token_id, start, end, resolution=LEGACY_RESOLUTION):
+        """
+        Record that [start, end] has been fetched with points every `resolution` ms.
+        Written only after the points themselves are stored, so the coverage file
+        doubles as a backfill checkpoint.
+        """
+        with self._lock:
+            stored = self._read_coverage(token_id)
+            stored[int(resolution)] = merge_intervals(stored.get(int(resolution), []) + [(int(start), int(end))])
+            os.makedirs(self._token_dir(token_id), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._token_dir(token_id), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({str(r): intervals for r, intervals in sorted(stored.items())}, f)
+            os.replace(tmp_path, self._coverage_path(token_id))
+        return stored[int(resolution)]
+
+    def missing_ranges(self, token_id, start, end, tolerance=0, resolution=None):
+        """
+        Sub-ranges of [start, end] not yet covered at `resolution` ms or finer
+        (any resolution when None); gaps up to tolerance ms are ignored
+        """
+        missing = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(token_id, resolution):
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start - cursor > tolerance:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if end - cursor > tolerance:
+            missing.append((cursor, end))
+        return missing
+
+    def read(self, token_id, start=None, end=None):
+        """
+        Points with start <= timestamp <= end (ms, inclusive) as a POINT_DTYPE array.
+        A range inside one month is a zero-copy view of the memory-mapped segment.
+        """
+        months = self.segments(token_id)
+        if start is not None:
+            first_month = str(self._months([start])[0])
+            months = [m for m in months if m >= first_month]
+        if end is not None:
+            last_month = str(self._months([end])[0])
+            months = [m for m in months if m <= last_month]
+
+        slices = []
+        for month in months:
+            segment = self._open_segment(token_id, month)
+            timestamps = segment["timestamp"]
+            lo = 0 if start is None else np.searchsorted(timestamps, start, side="left")
+            hi = len(segment) if end is None else np.searchsorted(timestamps, end, side="right")
+            if hi > lo:
+                slices.append(segment[lo:hi])
+
+        if not slices:
+            return np.empty(0, dtype=POINT_DTYPE)
+        if len(slices) == 1:
+            return slices[0]
+        return np.concatenate(slices)
+
+    def read_frame(self, token_id, start=None, end=None, step=None):
+        """
+        Range query as a DataFrame in the get_token_historical_data layout.
+        With step (ms) the points are resampled to a step grid starting at the first
+        one, taking the nearest point for each grid time, so ranges fetched at a finer
+        granularity don't give the series an uneven time step. The newest point is
+        always kept as the last row, so the latest price is never dropped.
+        """
+        points = self.read(token_id, start, end)
+        if step is not None and len(points) > 1:
+            timestamps = points["timestamp"]
+            grid = np.arange(timestamps[0], timestamps[-1] + 1, step)
+            right = np.searchsorted(timestamps, grid).clip(1, len(points) - 1)
+            left = right - 1
+            nearest = np.where(grid - timestamps[left] <= timestamps[right] - grid, left, right)
+            # Grid times inside a gap all land on the same point; keep it once
+            points = points[np.unique(np.append(nearest, len(points) - 1))]
+        df = pd.DataFrame({
+            "timestamp": np.asarray(points["timestamp"]),
+            "price": np.asarray(points["price"]),
+            "market_cap": np.asarray(points["market_cap"]),
+            "volume": np.asarray(points["volume"]),
+        })
+        df.insert(1, "date", pd.to_datetime(df["timestamp"], unit="ms"))
+        return df
@@ -0,0 +1,133 @@
+import heapq
+import threading
+from operator import itemgetter
+
+import numpy as np
+
+
+def top_k_positions(values, k, largest=True):
+    """
+    Positions of the k largest (or smallest) finite values, best first.
+    Partial selection with argpartition: O(n + k log k) instead of a full sort.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(values))
+    k = min(k, len(valid))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Negate so that "best" is always "smallest" for argpartition
+    keys = -values[valid] if largest else values[valid]
+    best = np.argpartition(keys, k - 1)[:k]
+    return valid[best[np.argsort(keys[best], kind="stable")]]
+
+
+class TopKTracker:
+    """
+    The k best tokens of the universe by one metric, kept current from the
+    ChangeSets of successive snapshots.
+
+    It holds up to 2k candidates, with the guarantee that every token outside
+    the candidate set scores no better than `threshold`. A delta refresh only
+    looks at changed rows: removed tokens leave, changed tokens above the
+    threshold join (the weakest candidates are trimmed off with a bounded
+    heap) and candidates that fall below it leave. Only when fewer than k
+    candidates remain, or a snapshot in the chain was missed, is the set
+    rebuilt with a partial selection over the whole universe.
+    """
+
+    def __init__(self, metric, k, largest=True, key="id"):
+        self.metric = metric
+        self.k = k
+        self.largest = largest
+        self.key = key
+        self.capacity = 2 * k
+        self.candidates = {}
+        self.threshold = -np.inf
+        self.version = None
+        self.rebuilds = 0
+        self.incremental_updates = 0
+        self._lock = threading.Lock()
+
+    def _scores(self, values):
+        # Scores are oriented so that higher is always better
+        values = np.asarray(values, dtype=np.float64)
+        return values if self.largest else -values
+
+    def update(self, snapshot):
+        """
+        Bring the tracker up to date with a snapshot and return that snapshot's
+        top k ids, best first, read under the same lock so that no other
+        session can move the tracker on in between
+        """
+        with self._lock:
+            if self.version is not None and snapshot.version < self.version:
+                # A session still holding an older snapshot: answer for it without moving back
+                values = snapshot.data[self.metric].to_numpy(dtype=np.float64)
+                return snapshot.data[self.key].to_numpy()[top_k_positions(values, self.k, self.largest)].tolist()
+
+            if snapshot.version != self.version:
+                incremental = (
+                    self.version is not None
+                    and snapshot.version == self.version + 1
+                    and snapshot.changes is not None
+                )
+                if incremental:
+                    self._apply(snapshot.data, snapshot.changes)
+                else:
+                    self._rebuild(snapshot.data)
+                self.version = snapshot.version
+            return self._top_ids()
+
+    def _rebuild(self, data):
+        positions = top_k_positions(data[self.metric].to_numpy(dtype=np.float64), self.capacity, self.largest)
+        ids = data[self.key].to_numpy()[positions]
+        scores = self._scores(data[self.metric].to_numpy(dtype=np.float64)[positions])
+        self.candidates = dict(zip(ids, scores.tolist()))
+        # With fewer rows than the capacity every finite value is a candidate
+        self.threshold = scores[-1] if len(positions) == self.capacity else -np.inf
+        self.rebuilds += 1
+
+    def _apply(self, data, changes):
+        for token_id in changes.removed:
+            self.candidates.pop(token_id, None)
+
+        changed = changes.added + changes.updated
+        if changed:
+            rows = data[data[self.key].isin(changed)]
+            scores = self._scores(rows[self.metric].to_numpy(dtype=np.float64))
+            for token_id, score in zip(rows[self.key].to_numpy(), scores.tolist()):
+                if np.isfinite(score) and (score > self.threshold or (token_id in self.candidates and score >= self.threshold)):
+                    self.candidates[token_id] = score
+                else:
+                    self.candidates.pop(token_id, None)
+
+        if len(self.candidates) > self.capacity:
+            kept = heapq.nlargest(self.capacity, self.candidates.items(), key=itemgetter(1))
+            self.candidates = dict(kept)
+            self.threshold = kept[-1][1]
+
+        if len(self.candidates) < self.k and self.threshold > -np.inf:
+            self._rebuild(data)
+        else:
+            self.incremental_updates += 1
+
+    def _top_ids(self):
+        return [token_id for token_id, _ in heapq.nlargest(self.k, self.candidates.items(), key=itemgetter(1))]
+
+    def top_ids(self):
+        """Ids of the current top k, best first"""
+        with self._lock:
+            return self._top_ids()
+
+    def top(self, data, ids=None):
+        """
+        Rows of the top k from a snapshot's data, best first. ids default to the
+        current top_ids(); ids missing from data are skipped rather than raising.
+        """
+        if ids is None:
+            ids = self.top_ids()
+        rank = {token_id: position for position, token_id in enumerate(ids)}
+        rows = data[data[self.key].isin(ids)].drop_duplicates(self.key)
+        order = np.argsort([rank[token_id] for token_id in rows[self.key]], kind="stable")
+        return rows.iloc[order].reset_index(drop=True)